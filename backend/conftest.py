@@ -1,6 +1,7 @@
 import pytest
 
 from readit.elasticsearch import get_elasticsearch_client
+from sources.fulltext import index_mapping
 
 HAS_TRIPLES = '''
 ASK {
@@ -59,6 +60,6 @@ def es_index_name():
 @pytest.fixture
 def es_client(settings, es_index_name):
     es = get_elasticsearch_client()
-    es.indices.create(index=es_index_name)
+    es.indices.create(index=es_index_name, mappings=index_mapping())
     yield es
     es.indices.delete(index=es_index_name)
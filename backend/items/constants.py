@@ -7,3 +7,7 @@ ITEMS_NS = '{}{}'.format(settings.RDF_NAMESPACE_ROOT, ITEMS_ROUTE)
 
 ITEMS_HISTORY_ROUTE = '{}-history/'.format(ITEMS_SLUG)
 ITEMS_HISTORY_NS = '{}{}'.format(settings.RDF_NAMESPACE_ROOT, ITEMS_HISTORY_ROUTE)
+
+# Cache namespace of data that is derived from the items graph, see
+# readit.cache. Bumped on every change through the items API.
+ITEMS_CACHE = 'items'
@@ -0,0 +1,133 @@
+"""
+Streaming export of items as N-Triples or N-Quads.
+
+Items are fetched and serialized page by page, so memory use does not
+depend on the size of the export.
+"""
+
+from itertools import count, islice
+from zlib import compressobj, MAX_WBITS
+
+from rdflib import ConjunctiveGraph, Graph, URIRef
+
+from rest_framework.exceptions import ValidationError
+
+from .constants import ITEMS_NS
+from .graph import graph
+from .index import annotations_of_source, describe_annotations
+from .traversal import traversal_params, is_annotations_request, traversal_query
+
+EXPORT_PAGE_SIZE = 1000  # annotations per query, triples per traversal page
+# syntax parameter: (content type, file extension, rdflib format)
+EXPORT_SYNTAXES = {
+    'nt': ('application/n-triples', 'nt', 'nt'),
+    'nq': ('application/n-quads', 'nq', 'nquads'),
+}
+EXPORT_OPTIONS = ('syntax', 'gzip', 'format')
+INVALID_SYNTAX_400 = 'syntax must be one of: {}.'.format(
+    ', '.join(EXPORT_SYNTAXES)
+)
+GZIP_WBITS = MAX_WBITS | 16  # write a gzip header and trailer
+
+
+def export_options(query_params):
+    """
+    Split the query parameters of ItemsAPIDownload.
+
+    Returns the selection parameters as a plain dict, the syntax and
+    whether to compress with gzip.
+    """
+    params = {
+        key: value for key, value in query_params.items()
+        if key not in EXPORT_OPTIONS
+    }
+    syntax = query_params.get('syntax', 'nt')
+    if syntax not in EXPORT_SYNTAXES:
+        raise ValidationError(INVALID_SYNTAX_400)
+    compress = query_params.get('gzip', '') not in ('', '0', 'false')
+    return params, syntax, compress
+
+
+def export_filename(name, syntax, compress):
+    extension = EXPORT_SYNTAXES[syntax][1]
+    return '{}.{}{}'.format(name, extension, '.gz' if compress else '')
+
+
+def item_pages(params, creator=None, page_size=EXPORT_PAGE_SIZE):
+    """
+    Return an iterator over the items selected by `params`, in pages.
+
+    `params` are the query parameters of ItemsAPIRoot and `creator` is
+    the user whose annotations may be exported, None for all. Each page
+    is an iterable of triples. The parameters are validated before the
+    first page is requested.
+    """
+    if not params:
+        return iter(())
+    p, o, t, r = traversal_params(params)
+    if is_annotations_request(p, o, t, r):
+        return annotation_pages(
+            annotations_of_source(o, creator), page_size,
+        )
+    return traversal_pages(p, o, t, r, page_size)
+
+
+def annotation_pages(rows, page_size):
+    """ Describe the annotations of index `rows`, `page_size` at a time. """
+    for offset in count(0, page_size):
+        page = [
+            URIRef(row.annotation)
+            for row in rows[offset:offset + page_size]
+        ]
+        if page:
+            yield describe_annotations(page)
+        if len(page) < page_size:
+            return
+
+
+def traversal_pages(p, o, t, r, page_size):
+    """
+    Run the traversal of ItemsAPIRoot, in pages of `page_size` triples.
+
+    The traversal is a single query, whose triples are streamed from the
+    triplestore, so it is neither sorted nor repeated per page.
+    """
+    items = graph()
+    triples = items.store.iter_construct(
+        traversal_query(p, o, t, r), items.identifier,
+    )
+    while True:
+        page = list(islice(triples, page_size))
+        if not page:
+            return
+        yield page
+
+
+def serialize_pages(pages, syntax):
+    """ Serialize each page of triples to one chunk of UTF-8 bytes. """
+    rdflib_format = EXPORT_SYNTAXES[syntax][2]
+    for page in pages:
+        if syntax == 'nq':
+            output = ConjunctiveGraph()
+            context = output.get_context(URIRef(ITEMS_NS))
+        else:
+            output = context = Graph()
+        context += page
+        if len(output):
+            yield output.serialize(format=rdflib_format, encoding='utf-8')
+
+
+def gzip_chunks(chunks):
+    """ Compress a sequence of byte chunks into a single gzip stream. """
+    compressor = compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(params, syntax, compress, creator=None):
+    """ Return the bytes of an export as an iterator over chunks. """
+    chunks = serialize_pages(item_pages(params, creator), syntax)
+    return gzip_chunks(chunks) if compress else chunks
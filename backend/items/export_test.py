@@ -0,0 +1,55 @@
+import gzip
+
+import pytest
+from rdflib import ConjunctiveGraph, Graph, URIRef
+
+from rest_framework.exceptions import ValidationError
+
+from rdf.ns import RDF, OA
+from . import namespace as ITEM
+from .constants import ITEMS_NS
+from .export import *
+
+
+def test_export_options():
+    params, syntax, compress = export_options({'o': 'x', 'format': 'nt'})
+    assert params == {'o': 'x'}
+    assert syntax == 'nt'
+    assert not compress
+    params, syntax, compress = export_options({'syntax': 'nq', 'gzip': '1'})
+    assert params == {}
+    assert syntax == 'nq'
+    assert compress
+    with pytest.raises(ValidationError):
+        export_options({'syntax': 'xml'})
+
+
+def test_export_filename():
+    assert export_filename('export', 'nt', False) == 'export.nt'
+    assert export_filename('export', 'nq', True) == 'export.nq.gz'
+
+
+def test_serialize_pages(itemgraph):
+    triples = list(itemgraph)
+    pages = [triples[:10], [], triples[10:]]
+    chunks = list(serialize_pages(pages, 'nt'))
+    assert len(chunks) == 2
+    output = Graph()
+    output.parse(data=b''.join(chunks).decode('utf-8'), format='nt')
+    assert set(output) == set(itemgraph)
+
+    compressed = b''.join(gzip_chunks(serialize_pages(pages, 'nq')))
+    output = ConjunctiveGraph()
+    output.parse(data=gzip.decompress(compressed).decode('utf-8'), format='nquads')
+    assert len(output) == len(itemgraph)
+    assert set(output.get_context(URIRef(ITEMS_NS))) == set(itemgraph)
+
+
+def test_traversal_pages(itemgraph, itemgraph_db):
+    pages = list(traversal_pages(RDF.type, OA.Annotation, 2, 0, 10))
+    assert all(0 < len(page) <= 10 for page in pages)
+    exported = {triple for page in pages for triple in page}
+    assert exported == set(itemgraph.triples((ITEM['7'], None, None))) | {
+        triple for triple in itemgraph
+        if triple[0] in (ITEM['1'], ITEM['4'], ITEM['5'], ITEM['6'])
+    }
@@ -0,0 +1,170 @@
+"""
+Index of the annotations that target each source.
+
+The triplestore is the authority on annotations, but finding all
+annotations of a source in there requires a costly join. The
+SourceAnnotation model keeps the result of that join, together with the
+creator and the position of each annotation, so that the annotations of
+a source can be listed in text order, one page at a time.
+
+The views in this package keep the index up to date. After changing
+items by other means, such as the SPARQL update endpoint, run the
+`index_annotations` management command to rebuild it. Each source is
+indexed from the triplestore when its annotations are first requested,
+so the index fills itself after an upgrade; IndexedSource records the
+sources for which this has happened.
+"""
+
+from django.db.models import F
+from django.db.transaction import atomic
+
+from rdflib import Graph, URIRef
+from rdflib.query import ResultException
+
+from rdf.ns import *
+from rdf.utils import graph_from_triples
+from .graph import graph
+from .models import SourceAnnotation, IndexedSource
+
+# Used to build bounded queries with a fixed list of resources.
+VALUES_PATTERN = 'VALUES ?{} {{ {} }}'
+# Maximum number of resources per query, to keep query strings short.
+BATCH_SIZE = 100
+
+RELATED_ANNOTATIONS_QUERY = '''
+SELECT DISTINCT ?annotation WHERE {{
+    {}
+    ?annotation (oa:hasTarget/oa:hasSelector?)? ?item;
+                rdf:type oa:Annotation.
+}}
+'''
+INDEX_QUERY = '''
+SELECT ?annotation ?source (SAMPLE(?user) AS ?creator) (MIN(?start) AS ?first)
+WHERE {{
+    {}
+    ?annotation rdf:type oa:Annotation;
+                oa:hasTarget ?target.
+    ?target oa:hasSource ?source.
+    OPTIONAL {{ ?annotation dcterms:creator ?user }}
+    OPTIONAL {{ ?target oa:hasSelector/oa:start ?start }}
+}}
+GROUP BY ?annotation ?source
+'''
+# Each branch describes one part of the annotations, so that the parts
+# are not multiplied with each other.
+ANNOTATIONS_QUERY = '''
+CONSTRUCT {{
+    ?subject ?predicate ?object.
+}} WHERE {{
+    {{ {0} ?annotation ?predicate ?object. BIND(?annotation AS ?subject) }}
+    UNION {{ {0} ?annotation oa:hasBody ?subject. ?subject ?predicate ?object. }}
+    UNION {{ {0} ?annotation oa:hasTarget ?subject. ?subject ?predicate ?object. }}
+    UNION {{ {0} ?annotation oa:hasTarget/oa:hasSelector ?subject. ?subject ?predicate ?object. }}
+}}
+'''
+INDEX_NS = {
+    'oa': OA,
+    'dcterms': DCTERMS,
+    'rdf': RDF,
+}
+
+
+def values(variable, resources):
+    """ Restrict `variable` to `resources` in a SPARQL query. """
+    return VALUES_PATTERN.format(
+        variable, ' '.join(resource.n3() for resource in resources),
+    )
+
+
+def related_annotations(items):
+    """
+    Return the annotations that depend on any of `items`.
+
+    These are the annotations among `items` and the annotations that
+    have one of `items` as their target or as a selector of their target.
+    """
+    if not items:
+        return set()
+    query = RELATED_ANNOTATIONS_QUERY.format(values('item', items))
+    result = graph().query(query, initNs=INDEX_NS)
+    return {row.annotation for row in result}
+
+
+def index_rows(annotations=None, source=None):
+    """ Generate index rows for `annotations` or `source`, or all if None. """
+    restriction = ''
+    if annotations is not None:
+        restriction += values('annotation', annotations)
+    if source is not None:
+        restriction += values('source', [URIRef(source)])
+    query = INDEX_QUERY.format(restriction)
+    for row in graph().query(query, initNs=INDEX_NS):
+        yield SourceAnnotation(
+            annotation=str(row.annotation),
+            source=str(row.source),
+            creator=str(row.creator or ''),
+            start=None if row.first is None else int(row.first),
+        )
+
+
+@atomic
+def index_annotations(annotations):
+    """ Bring the index up to date for `annotations`. """
+    annotations = list(annotations)
+    for offset in range(0, len(annotations), BATCH_SIZE):
+        batch = annotations[offset:offset + BATCH_SIZE]
+        SourceAnnotation.objects.filter(
+            annotation__in=map(str, batch),
+        ).delete()
+        SourceAnnotation.objects.bulk_create(index_rows(batch))
+
+
+@atomic
+def index_source(source):
+    """ Recompute the index for the annotations of `source`. """
+    SourceAnnotation.objects.filter(source=str(source)).delete()
+    SourceAnnotation.objects.bulk_create(index_rows(source=source))
+    IndexedSource.objects.get_or_create(source=str(source))
+
+
+@atomic
+def rebuild_index():
+    """ Recompute the index for all annotations. """
+    SourceAnnotation.objects.all().delete()
+    SourceAnnotation.objects.bulk_create(index_rows(), batch_size=1000)
+    sources = SourceAnnotation.objects.values_list('source', flat=True)
+    IndexedSource.objects.all().delete()
+    IndexedSource.objects.bulk_create(
+        (IndexedSource(source=source) for source in sources.distinct()),
+        batch_size=1000,
+    )
+
+
+def annotations_of_source(source, creator=None):
+    """
+    Return the index rows of `source` in text order.
+
+    Pass `creator` to only include annotations by that user. If the
+    source was never indexed as a whole, it is indexed first.
+    """
+    if not IndexedSource.objects.filter(source=str(source)).exists():
+        index_source(source)
+    rows = SourceAnnotation.objects.filter(source=str(source))
+    if creator is not None:
+        rows = rows.filter(creator=str(creator))
+    return rows.order_by(F('start').asc(nulls_last=True), 'id')
+
+
+def describe_annotations(annotations):
+    """
+    Return a graph with `annotations`, their bodies, targets and selectors.
+
+    Only bodies that are items are described.
+    """
+    if not annotations:
+        return Graph()
+    query = ANNOTATIONS_QUERY.format(values('annotation', annotations))
+    try:
+        return graph_from_triples(graph().query(query, initNs=INDEX_NS))
+    except ResultException:
+        return Graph()
@@ -0,0 +1,50 @@
+from rdflib import URIRef
+
+from sources import namespace as SOURCE
+from staff import namespace as STAFF
+from . import namespace as ITEM
+from .index import *
+from .models import SourceAnnotation, IndexedSource
+
+
+def test_related_annotations(itemgraph_db):
+    assert related_annotations([ITEM['7']]) == {ITEM['7']}
+    assert related_annotations([ITEM['5']]) == {ITEM['7']}
+    assert related_annotations([ITEM['4']]) == {ITEM['7']}
+    assert related_annotations([ITEM['6']]) == set()
+    assert related_annotations([]) == set()
+
+
+def test_index_annotations(itemgraph_db):
+    index_annotations([ITEM['7']])
+    row = SourceAnnotation.objects.get()
+    assert row.annotation == str(ITEM['7'])
+    assert row.source == str(SOURCE['1'])
+    assert row.creator == str(STAFF.tester)
+    assert row.start == 22
+    rebuild_index()
+    assert SourceAnnotation.objects.count() == 1
+    assert list(annotations_of_source(SOURCE['1'], STAFF.tester)) == [
+        SourceAnnotation.objects.get()
+    ]
+    assert not annotations_of_source(SOURCE['1'], STAFF.someone_else)
+
+
+def test_index_on_first_use(itemgraph_db):
+    # a new annotation was indexed before the source as a whole
+    SourceAnnotation.objects.create(
+        annotation=str(ITEM['8']), source=str(SOURCE['1']),
+    )
+    rows = annotations_of_source(SOURCE['1'])
+    assert [row.annotation for row in rows] == [str(ITEM['7'])]
+    assert IndexedSource.objects.filter(source=str(SOURCE['1'])).exists()
+    assert not annotations_of_source(SOURCE['2'])
+    assert IndexedSource.objects.filter(source=str(SOURCE['2'])).exists()
+
+
+def test_describe_annotations(itemgraph_db):
+    result = describe_annotations([ITEM['7']])
+    assert set(result.subjects()) == {
+        ITEM['1'], ITEM['4'], ITEM['5'], ITEM['6'], ITEM['7'],
+    }
+    assert len(describe_annotations([])) == 0
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from items.index import rebuild_index
+from items.models import SourceAnnotation
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the index of annotations by source.'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write('Indexed {} annotations.'.format(
+            SourceAnnotation.objects.count()))
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0006_auto_20220412_1211'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceAnnotation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annotation', models.CharField(db_index=True, max_length=255)),
+                ('source', models.CharField(max_length=255)),
+                ('creator', models.CharField(blank=True, max_length=255)),
+                ('start', models.PositiveIntegerField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='sourceannotation',
+            index=models.Index(fields=['source', 'start'], name='items_sourc_source_f859ae_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0007_sourceannotation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('params', models.JSONField(default=dict)),
+                ('syntax', models.CharField(default='nt', max_length=2)),
+                ('compress', models.BooleanField(default=False)),
+                ('visible_creator', models.CharField(blank=True, max_length=255)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be processed'), ('exporting', 'Writing the export'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('creator', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
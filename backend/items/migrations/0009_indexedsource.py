@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0008_itemexport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexedSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+    ]
@@ -1,15 +1,46 @@
+import uuid
+
 from django.db import models
+from django.db.models import F
+from django.db.transaction import atomic
 from django.conf import settings
 
+from rdflib import URIRef
+
 from rdf.baseclasses import BaseCounter
 from .constants import ITEMS_NS, ITEMS_HISTORY_NS
 
 
-class ItemCounter(BaseCounter):
+class ReservableCounter(BaseCounter):
+    """ Counter that can hand out a block of subject URIs at once. """
+    class Meta:
+        abstract = True
+
+    @atomic
+    def reserve(self, number):
+        """
+        Add `number` to the count in a single update.
+
+        Returns the subject URIs of the `number` reserved serials, in
+        order. Concurrent reservations never overlap.
+        """
+        if number < 1:
+            return []
+        self.count = F('count') + number
+        self.save()
+        self.refresh_from_db()
+        first = self.count - number + 1
+        return [
+            URIRef('{}{}'.format(self.namespace, serial))
+            for serial in range(first, self.count + 1)
+        ]
+
+
+class ItemCounter(ReservableCounter):
     namespace = ITEMS_NS
 
 
-class EditCounter(BaseCounter):
+class EditCounter(ReservableCounter):
     namespace = ITEMS_HISTORY_NS
 
 
@@ -23,3 +54,66 @@ class SemanticQuery(models.Model):
 
     def __str__(self):
         return self.label or str(self.id)
+
+
+class SourceAnnotation(models.Model):
+    """ Entry of the index of annotations by source, see items.index. """
+    annotation = models.CharField(max_length=255, db_index=True)
+    source = models.CharField(max_length=255)
+    creator = models.CharField(max_length=255, blank=True)
+    start = models.PositiveIntegerField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['source', 'start'])]
+
+    def __str__(self):
+        return '{} -> {}'.format(self.annotation, self.source)
+
+
+class IndexedSource(models.Model):
+    """ A source whose annotations are all in the SourceAnnotation index. """
+    source = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.source
+
+
+class ItemExport(models.Model):
+    """ An export of items that is written to the media storage. """
+    PENDING = 'pending'
+    EXPORTING = 'exporting'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Waiting to be processed'),
+        (EXPORTING, 'Writing the export'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # selection parameters of ItemsAPIRoot
+    params = models.JSONField(default=dict)
+    syntax = models.CharField(max_length=2, default='nt')
+    compress = models.BooleanField(default=False)
+    # user whose annotations may be exported, blank for all
+    visible_creator = models.CharField(max_length=255, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING,
+    )
+    detail = models.TextField(blank=True)
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{} ({})'.format(self.token, self.status)
+
+    def advance(self, status, detail=''):
+        """ Record that the export has reached `status`. """
+        self.status = status
+        self.detail = detail
+        self.save(update_fields=['status', 'detail', 'updated'])
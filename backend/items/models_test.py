@@ -1,5 +1,7 @@
 import pytest
 
+from rdflib import URIRef
+
 from .models import ItemCounter
 from .constants import ITEMS_NS
 
@@ -33,3 +35,14 @@ def test_ItemCounter_increment():
     assert counter2.pk == counter1.pk
     assert counter1.count == 2
     assert counter2.count == 2
+
+
+@pytest.mark.django_db
+def test_ItemCounter_reserve():
+    counter = ItemCounter.current
+    assert counter.reserve(0) == []
+    uris = counter.reserve(3)
+    assert uris == [URIRef('{}{}'.format(ITEMS_NS, n)) for n in (2, 3, 4)]
+    assert counter.count == 4
+    counter.increment()
+    assert counter.reserve(1) == [URIRef('{}{}'.format(ITEMS_NS, 6))]
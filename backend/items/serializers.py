@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import SemanticQuery
+from .models import SemanticQuery, ItemExport
 
 
 class SemanticQuerySerializerFull(serializers.ModelSerializer):
@@ -18,3 +18,9 @@ class SemanticQuerySerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['creator'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class ItemExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ItemExport
+        fields = ['token', 'status', 'detail', 'created', 'updated']
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from tempfile import TemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from rdflib import URIRef
+
+from readit import celery_app
+from .export import export_chunks, export_filename
+from .models import ItemExport
+
+EXPORT_DIRECTORY = 'exports'
+
+
+class ExportTask(celery_app.Task):
+    """ Marks the ItemExport of the first argument as failed on errors. """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        ItemExport.objects.filter(token=args[0]).update(
+            status=ItemExport.FAILED, detail=str(exc),
+        )
+
+
+@celery_app.task(base=ExportTask, time_limit=settings.EXPORT_TIME_LIMIT)
+def export_items(token):
+    """
+    Write the export with `token` to the media storage.
+
+    The export is spooled to a temporary file first, so that memory use
+    does not depend on its size. Large exports may take longer than
+    other tasks, so this task has its own time limit.
+    """
+    export = ItemExport.objects.get(token=token)
+    export.advance(ItemExport.EXPORTING)
+    creator = export.visible_creator
+    chunks = export_chunks(
+        export.params, export.syntax, export.compress,
+        URIRef(creator) if creator else None,
+    )
+    name = export_filename(
+        '{}/items-{}'.format(EXPORT_DIRECTORY, token),
+        export.syntax, export.compress,
+    )
+    with TemporaryFile() as spool:
+        for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+        export.filename = default_storage.save(name, File(spool))
+    export.save(update_fields=['filename'])
+    export.advance(ItemExport.DONE)
+
+
+@celery_app.task
+def delete_expired_exports():
+    """
+    Delete exports that were last updated over EXPORT_EXPIRY seconds ago.
+
+    This task is scheduled periodically by celery beat.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.EXPORT_EXPIRY)
+    for export in ItemExport.objects.filter(updated__lt=deadline):
+        if export.filename:
+            default_storage.delete(export.filename)
+        export.delete()
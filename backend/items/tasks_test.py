@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import ItemExport
+from .tasks import delete_expired_exports
+
+
+def test_delete_expired_exports(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    filename = default_storage.save('exports/items-old.nt', ContentFile(b''))
+    old = ItemExport.objects.create(filename=filename, status=ItemExport.DONE)
+    ItemExport.objects.filter(pk=old.pk).update(
+        updated=timezone.now() - timedelta(seconds=settings.EXPORT_EXPIRY + 1),
+    )
+    recent = ItemExport.objects.create()
+    delete_expired_exports()
+    assert list(ItemExport.objects.all()) == [recent]
+    assert not default_storage.exists(filename)
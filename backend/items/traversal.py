@@ -0,0 +1,113 @@
+"""
+Selection of items by predicate and object, followed by a traversal.
+
+These are the query parameters of ItemsAPIRoot and ItemsAPIDownload:
+p (predicate), o or o_literal (object), t (plys forward) and r (plys
+backward).
+"""
+
+from rdflib import URIRef, Literal
+
+from rest_framework.exceptions import ValidationError
+
+from rdf.ns import RDF
+from sources import namespace as source
+
+INVALID_TERM_400 = 'Invalid predicate or object.'
+
+# A property path that matches any single predicate.
+ANY_PREDICATE = '(<{0}>|!<{0}>)'.format(RDF.nil)
+# Maximum number of plys for the t and r parameters of ItemsAPIRoot.
+MAX_TRAVERSAL = 5
+TRAVERSAL_QUERY = '''
+CONSTRUCT {{
+    ?resource ?predicate ?object.
+}} WHERE {{
+    {{
+        SELECT DISTINCT ?resource WHERE {{
+            {pattern}
+        }}
+    }}
+    ?resource ?predicate ?object.
+}}
+'''
+
+
+def optional_int(text):
+    """ Try to parse `text` as a decimal int, return None on failure. """
+    try:
+        return int(text)
+    except:
+        return None
+
+
+def traversal_params(params):
+    """
+    Parse the query parameters of ItemsAPIRoot into (p, o, t, r).
+
+    Raises ValidationError if the predicate or object is not a valid URI.
+    """
+    p = params.get('p')
+    p = p and URIRef(p)
+    o = params.get('o')
+    if o:
+        o = URIRef(o)
+    else:
+        o = params.get('o_literal')
+        o = o and Literal(o)
+    try:
+        # rdflib refuses to serialize invalid URIs
+        p and p.n3()
+        o and o.n3()
+    except Exception:
+        raise ValidationError(INVALID_TERM_400)
+    t = min(max(optional_int(params.get('t')) or 0, 0), MAX_TRAVERSAL)
+    r = min(max(optional_int(params.get('r')) or 0, 0), MAX_TRAVERSAL)
+    return p, o, t, r
+
+
+def is_annotations_request(p, o, t, r):
+    """
+    Whether (p, o, t, r) asks for the annotations of a source.
+
+    Such requests are answered from the annotation index. Kept for old
+    clients; use AnnotationsOfSource instead.
+    """
+    return (
+        p is None and t == 1 and r == 1 and isinstance(o, URIRef) and
+        str(o).startswith(str(source))
+    )
+
+
+def bounded_path(plys):
+    """ Return a property path of 1 up to `plys` arbitrary predicates. """
+    return '|'.join(
+        '/'.join([ANY_PREDICATE] * length) for length in range(1, plys + 1)
+    )
+
+
+def traversal_query(p, o, t, r):
+    """
+    Compile the parameters of ItemsAPIRoot into a single CONSTRUCT query.
+
+    The query returns all triples of the subjects that have predicate
+    `p` and object `o`, either of which may be None to match anything.
+    It also returns the triples of the resources that can be reached
+    from those subjects by following at most `t` triples forward and of
+    those that can reach the subjects in at most `r` triples.
+    """
+    core = '?core {} {}.'.format(
+        p.n3() if p else '?p',
+        o.n3() if o else '?o',
+    )
+    branches = ['BIND(?core AS ?resource)']
+    if t:
+        branches.append('?core {} ?resource'.format(bounded_path(t)))
+    if r:
+        branches.append('?resource {} ?core'.format(bounded_path(r)))
+    # repeat the core pattern in each branch, so each can be evaluated
+    # starting from the selected subjects
+    pattern = '\n            UNION '.join(
+        '{{ {} {} }}'.format(core, branch) for branch in branches
+    )
+    return TRAVERSAL_QUERY.format(pattern=pattern)
@@ -2,11 +2,16 @@ from django.urls import path
 
 from rest_framework.urlpatterns import format_suffix_patterns
 
-from .views import ItemsAPIRoot, ItemsAPIDownload, ItemsAPISingular, ItemsOfCategory
+from .views import ItemsAPIRoot, ItemsAPIDownload, ItemsAPISingular, ItemsOfCategory, \
+    AnnotationsOfSource, ItemExportStatus, ItemExportFile, ItemsAPIBatch
 
 urlpatterns = format_suffix_patterns([
     path('', ItemsAPIRoot.as_view()),
+    path('batch', ItemsAPIBatch.as_view()),
     path('download', ItemsAPIDownload.as_view()),
+    path('download/<uuid:token>', ItemExportStatus.as_view(), name='item-export'),
+    path('download/<uuid:token>/file', ItemExportFile.as_view(), name='item-export-file'),
+    path('by-source/<int:serial>', AnnotationsOfSource.as_view(), name='by-source'),
     path('<int:serial>', ItemsAPISingular.as_view()),
     path('<slug:category>', ItemsOfCategory.as_view()),
 ])
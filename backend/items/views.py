@@ -1,12 +1,18 @@
 from datetime import datetime, timezone
 from io import BytesIO
+from os.path import basename
+from urllib.parse import urlencode
 from rdflib.plugins.sparql.parser import BlankNode
 
-from django.http import FileResponse, HttpResponse
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 
 from rest_framework.decorators import action, api_view, renderer_classes
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.status import *
 from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
 from rest_framework.viewsets import GenericViewSet
@@ -18,25 +24,43 @@ from rdflib.plugins.sparql import prepareQuery
 
 from rdf.views import RDFView, RDFResourceView, graph_from_request
 from rdf.ns import *
-from rdf.utils import graph_from_triples, append_triples, sample_graph, traverse_forward, traverse_backward
+from rdf.utils import graph_from_triples, sample_graph
 from vocab import namespace as vocab
 from staff import namespace as staff
 from staff.utils import submission_info
 from ontology import namespace as ontology
 from sources import namespace as source
+from readit.cache import get_version, bump_version
 from . import namespace as my
-from .graph import graph, history
-from .models import ItemCounter, EditCounter, SemanticQuery
+from .constants import ITEMS_NS, ITEMS_HISTORY_NS, ITEMS_CACHE
+from .export import (EXPORT_SYNTAXES, export_options, export_filename,
+                     export_chunks)
+from .graph import graph
+from .index import (BATCH_SIZE, values, index_annotations, related_annotations,
+                    annotations_of_source, describe_annotations)
+from .models import ItemCounter, EditCounter, SemanticQuery, ItemExport
 from .permissions import *
-from .serializers import SemanticQuerySerializer, SemanticQuerySerializerFull
+from .serializers import (SemanticQuerySerializer, SemanticQuerySerializerFull,
+                          ItemExportSerializer)
+from .tasks import export_items
+from .traversal import (optional_int, traversal_params, is_annotations_request,
+                        traversal_query)
 
 MUST_SINGLE_BLANK_400 = 'POST requires exactly one subject which must be a blank node.'
+MUST_BLANK_SUBJECTS_400 = 'POST requires one or more subjects which must all be blank nodes.'
+UNKNOWN_BLANK_OBJECT_400 = 'Blank nodes in the object position must also be subjects.'
+MUST_ITEM_SUBJECTS_400 = 'DELETE requires one or more subjects which must all be items.'
 MUST_EQUAL_IDENTIFIER_400 = 'PUT must affect exactly the resource URI.'
 MUST_BE_OWNER_403 = 'PUT or DELETE is only allowed to the resource owner.'
 BLANK_OBJECT_PREDICATE_400 = 'Blank nodes in the predicate or object positions are not allowed.'
 DOES_NOT_EXIST_404 = 'Resource does not exist.'
+EXPORT_NOT_READY_404 = 'The export is not finished.'
 
-ANNOTATION_CUTOFF = 10 # don't return more than 10 annotations when querying by category
+GZIP_CONTENT_TYPE = 'application/gzip'
+
+ANNOTATION_CUTOFF = 10 # default number of annotations per page when querying by category
+MAX_ANNOTATIONS_OF_CATEGORY = 1000 # maximum page size when querying by category
+ANNOTATIONS_PER_PAGE = 1000 # maximum page size of AnnotationsOfSource
 
 DEFAULT_NS = {
     'vocab': vocab,
@@ -53,36 +77,98 @@ modified provenance publisher relation replaces rights rightsHolder source type
 valid
 '''.split())
 
-ANNO_QUERY = '''
-CONSTRUCT {
-    ?annotation ?a ?b.
-    ?body ?c ?d.
-    ?target ?e ?f.
-    ?selector ?g ?h.
-} WHERE {
-    ?annotation oa:hasBody ?body.
-    OPTIONAL { ?body ?c ?d }.
-    ?annotation oa:hasTarget ?target;
-                dcterms:creator ?user;
-                ?a ?b.
-    ?target oa:hasSource ?source;
-            oa:hasSelector ?selector;
-            ?e ?f.
-    ?selector ?g ?h.
-}
+# Restricts ?annotation to the items that are annotations of ?category,
+# optionally by ?user.
+CATEGORY_PATTERN = '''
+    ?annotation oa:hasBody {category} .
+    {creator}
+    FILTER(STRSTARTS(STR(?annotation), "{prefix}"))
 '''
+# Pages are ordered by IRI, which SPARQL compares as strings, and continue
+# after the IRI of the last annotation of the previous page.
 ANNO_OF_CATEGORY_QUERY = '''
-SELECT ?annotation ?a ?b
-WHERE {
-    ?annotation dcterms:creator ?user ;
-        oa:hasBody ?category ;
-        ?a ?b .
-}
+CONSTRUCT {{
+    ?annotation ?a ?b .
+}} WHERE {{
+    {{
+        SELECT ?annotation WHERE {{
+            {pattern}
+            FILTER(STR(?annotation) > {after})
+        }}
+        ORDER BY ?annotation
+        LIMIT {limit}
+    }}
+    ?annotation ?a ?b .
+}}
+'''
+COUNT_OF_CATEGORY_QUERY = '''
+SELECT (COUNT(DISTINCT ?annotation) AS ?total) WHERE {{
+    {pattern}
+}}
 '''
+CATEGORY_COUNT_KEY = 'category-count:{}:{}:{}'
+# Selects the annotations to delete in bulk, along with their creators.
+BULK_DELETE_CHECK_QUERY = '''
+CONSTRUCT {{
+    ?annotation ?p ?o.
+}} WHERE {{
+    {}
+    ?annotation rdf:type oa:Annotation;
+                ?p ?o.
+}}
+'''
+# Deletes annotations along with their targets, selectors and item
+# bodies, as far as those parts are removable, see bulk_delete_query.
+BULK_DELETE_QUERY = '''
+DELETE {{
+    GRAPH <{items}> {{
+        ?resource ?p ?o.
+    }}
+}} WHERE {{
+    GRAPH <{items}> {{
+        {{
+            {resources}
+        }} UNION {{
+            {annotations}
+            ?annotation oa:hasTarget ?resource.
+            {target}
+        }} UNION {{
+            {annotations}
+            ?annotation oa:hasTarget ?target.
+            ?target oa:hasSelector ?resource.
+            {selector}
+        }} UNION {{
+            {annotations}
+            ?annotation oa:hasBody ?resource.
+            FILTER(STRSTARTS(STR(?resource), "{items}"))
+            {body}
+        }}
+        ?resource ?p ?o.
+    }}
+}}
+'''
+# ?{node} was created by the requester and has no edit history.
+OWNED_PATTERN = '''
+            ?{node} dcterms:creator {user}.
+            FILTER NOT EXISTS {{
+                GRAPH <{history}> {{ ?{node}Record ?{node}Field ?{node}. }}
+            }}'''
+# Nothing refers to ?{node} besides {others}.
+UNREFERENCED_PATTERN = '''
+            FILTER NOT EXISTS {{
+                ?{node}Referrer ?{node}Reference ?{node}.
+                FILTER(?{node}Referrer NOT IN ({others}))
+            }}'''
+DATA_OPERATION = '''{operation} DATA {{
+    GRAPH {graph} {{
+{triples}
+    }}
+}}'''
 ANNO_NS = {
     'oa': OA,
     'dcterms': DCTERMS,
-    'rdf': RDF
+    'rdf': RDF,
+    'xsd': XSD,
 }
 
 
@@ -97,25 +183,24 @@ def sanitize(input):
     return graph_from_triples(filter(is_unreserved, input))
 
 
-def optional_int(text):
-    """ Try to parse `text` as a decimal int, return None on failure. """
-    try:
-        return int(text)
-    except:
+def visible_creator(request):
+    """
+    Return the user whose annotations `request` may see, None for all.
+
+    Temporary special case: show users only their own annotations,
+    unless they have special permission to see all.
+    """
+    if request.user.has_perm('rdflib_django.view_all_annotations'):
         return None
+    user, now = submission_info(request)
+    return user
 
 
-def save_snapshot(identifier, previous, request):
-    """ Keep track of the previous version of a changed item. """
-    g = history()
+def snapshot(identifier, previous, request):
+    """ Return the triples that record the previous version of an item. """
     user, now = submission_info(request)
-    counter = EditCounter.current
-    uris = []
-    for i in range(4):
-        counter.increment()
-        uris.append(URIRef(str(counter)))
-    annotation, body, target, state = uris
-    append_triples(g, (
+    annotation, body, target, state = EditCounter.current.reserve(4)
+    return [
         (annotation, RDF.type, OA.Annotation),
         (annotation, OA.hasBody, body),
         (annotation, OA.hasTarget, target),
@@ -126,8 +211,38 @@ def save_snapshot(identifier, previous, request):
         (target, OA.hasState, state),
         (state, RDF.type, OA.TimeState),
         (state, OA.sourceDate, now),
-    ))
-    append_triples(g, ((body, p, o) for (s, p, o) in previous))
+    ] + [(body, p, o) for (s, p, o) in previous]
+
+
+def data_operation(operation, graph, triples):
+    """ Compile an INSERT DATA or DELETE DATA operation on `graph`. """
+    return DATA_OPERATION.format(
+        operation=operation,
+        graph=graph.n3(),
+        triples='\n'.join(
+            '        {} {} {} .'.format(s.n3(), p.n3(), o.n3())
+            for (s, p, o) in triples
+        ),
+    )
+
+
+def edit_update(snapshot, removed, added):
+    """
+    Compile an edit of an item into a single SPARQL update.
+
+    The update stores the `snapshot` in the history, then removes the
+    `removed` triples from and inserts the `added` triples into the
+    items graph. Operations without triples are left out.
+    """
+    operations = (
+        ('INSERT', ITEMS_HISTORY_NS, snapshot),
+        ('DELETE', ITEMS_NS, removed),
+        ('INSERT', ITEMS_NS, added),
+    )
+    return ';\n'.join(
+        data_operation(operation, URIRef(graph), triples)
+        for (operation, graph, triples) in operations if len(triples)
+    )
 
 
 class ItemsAPIRoot(RDFView):
@@ -142,42 +257,18 @@ class ItemsAPIRoot(RDFView):
         params = request.query_params
         if not params:
             return core
-        # params: p - predicate, o(_literal) - object, t - traverse, r - reverse
-        p = params.get('p')
-        p = p and URIRef(p)
-        o = params.get('o')
-        if o:
-            o = URIRef(o)
-        else:
-            o = params.get('o_literal')
-            o = o and Literal(o)
-        t = optional_int(params.get('t')) or 0
-        r = optional_int(params.get('r')) or 0
-        # Heuristic to recognize requests for annotations. Facilitates SPARQL
-        # shortcut below. TODO: remove this again.
-        is_annotations_request = p is None and t == 1 and r == 1 and isinstance(o, URIRef) and str(o).startswith(str(source))
-        if is_annotations_request:
-            bindings = {'source': o}
-            # Temporary special case: show users only their own annotations,
-            # unless they have special permission to see all.
-            if not request.user.has_perm('rdflib_django.view_all_annotations'):
-                user, now = submission_info(request)
-                bindings['user'] = user
-            try:
-                return graph_from_triples(self.graph().query(
-                    ANNO_QUERY, initBindings=bindings, initNs=ANNO_NS
-                ))
-            except ResultException:
-                return Graph()
-        # get the initial graph based on p, o, o_literal params
-        full_graph = super().get_graph(request)
-        subjects = set(full_graph.subjects(p, o))
-        for s in subjects:
-            append_triples(core, full_graph.triples((s, None, None)))
-        # traverse from here based on t, r params
-        children = traverse_forward(full_graph, core, t)
-        parents = traverse_backward(full_graph, core, r)
-        return parents | core | children
+        p, o, t, r = traversal_params(params)
+        if is_annotations_request(p, o, t, r):
+            rows = annotations_of_source(o, visible_creator(request))
+            return describe_annotations([URIRef(row.annotation) for row in rows])
+        # select based on p, o, o_literal params and traverse from there
+        # based on t, r params, all in a single round trip
+        try:
+            return graph_from_triples(
+                self.graph().query(traversal_query(p, o, t, r))
+            )
+        except ResultException:
+            return Graph()
 
     def post(self, request, format=None):
         data = graph_from_request(request)
@@ -200,18 +291,194 @@ class ItemsAPIRoot(RDFView):
         result.add((new_subject, DCTERMS.created, now))
         full_graph = super().get_graph(request)
         full_graph += result
+        if (new_subject, RDF.type, OA.Annotation) in result:
+            index_annotations([new_subject])
+        bump_version(ITEMS_CACHE)
+        return Response(result, HTTP_201_CREATED)
+
+
+class ItemsAPIBatch(ItemsAPIRoot):
+    """
+    Create or delete many items in a single request.
+
+    On POST, all subjects of the posted graph must be blank nodes. Blank nodes may
+    also be objects, in order to link the new items to each other. A
+    block of item URIs is reserved at once and everything is written in
+    a single INSERT DATA. Besides the new items, the response contains an
+    owl:sameAs triple from each new URI to the blank node that it
+    replaces.
+
+    On DELETE, all subjects of the graph must be annotations of the
+    current user (unless superuser). They are deleted together with
+    those of their targets, selectors and item bodies that the current
+    user created, that have no edit history and that no other item
+    refers to, in one update per BATCH_SIZE annotations. The response
+    contains the deleted annotations.
+    """
+    http_method_names = ['post', 'delete', 'options']
+
+    def post(self, request, format=None):
+        data = graph_from_request(request)
+        subjects = set(data.subjects())
+        if not subjects or not all(isinstance(s, BNode) for s in subjects):
+            raise ValidationError(MUST_BLANK_SUBJECTS_400)
+        for (s, p, o) in data:
+            if isinstance(p, BNode):
+                raise ValidationError(BLANK_OBJECT_PREDICATE_400)
+            if isinstance(o, BNode) and o not in subjects:
+                raise ValidationError(UNKNOWN_BLANK_OBJECT_400)
+        user, now = submission_info(request)
+        subjects = sorted(subjects)
+        mapping = dict(zip(subjects, ItemCounter.current.reserve(len(subjects))))
+        result = Graph()
+        for abbreviation, ns in DEFAULT_NS.items():
+            result.bind(abbreviation, ns)
+        for s, p, o in filter(is_unreserved, data):
+            result.add((mapping[s], p, mapping.get(o, o)))
+        for new_subject in mapping.values():
+            result.add((new_subject, DCTERMS.creator, user))
+            result.add((new_subject, DCTERMS.created, now))
+        self.graph().store.update(
+            data_operation('INSERT', URIRef(ITEMS_NS), result)
+        )
+        annotations = set(result.subjects(RDF.type, OA.Annotation))
+        if annotations:
+            index_annotations(annotations)
+        bump_version(ITEMS_CACHE)
+        for bnode, new_subject in mapping.items():
+            result.add((new_subject, OWL.sameAs, bnode))
         return Response(result, HTTP_201_CREATED)
 
+    def delete(self, request, format=None):
+        data = graph_from_request(request)
+        annotations = set(data.subjects())
+        if not annotations or not all(
+            isinstance(a, URIRef) and a.startswith(ITEMS_NS)
+            for a in annotations
+        ):
+            raise ValidationError(MUST_ITEM_SUBJECTS_400)
+        annotations = sorted(annotations)
+        existing = Graph()
+        for offset in range(0, len(annotations), BATCH_SIZE):
+            batch = annotations[offset:offset + BATCH_SIZE]
+            existing += self.graph().query(
+                BULK_DELETE_CHECK_QUERY.format(values('annotation', batch)),
+                initNs=ANNO_NS,
+            ).graph
+        if set(existing.subjects()) != set(annotations):
+            raise NotFound(detail=DOES_NOT_EXIST_404)
+        user, now = submission_info(request)
+        if not request.user.is_superuser and any(
+            existing.value(annotation, DCTERMS.creator) != user
+            for annotation in annotations
+        ):
+            raise PermissionDenied(detail=MUST_BE_OWNER_403)
+        for offset in range(0, len(annotations), BATCH_SIZE):
+            batch = annotations[offset:offset + BATCH_SIZE]
+            self.graph().store.update(
+                bulk_delete_query(batch, user), initNs=ANNO_NS,
+            )
+        index_annotations(annotations)
+        bump_version(ITEMS_CACHE)
+        return Response(existing)
+
+
+def bulk_delete_query(annotations, user):
+    """
+    Compile the deletion of `annotations` into a single SPARQL update.
+
+    Targets, selectors and item bodies are only deleted if `user`
+    created them, no edit history refers to them and nothing else
+    refers to them besides `annotations`. Selectors additionally go only
+    along with their own target and may not be shared with other
+    targets. A part that is shared with annotations in a later batch is
+    kept until the last of those is deleted.
+    """
+    others = ', '.join(annotation.n3() for annotation in annotations)
+
+    def removable(node, others=others):
+        return OWNED_PATTERN.format(
+            node=node, user=user.n3(), history=ITEMS_HISTORY_NS,
+        ) + UNREFERENCED_PATTERN.format(node=node, others=others)
+
+    return BULK_DELETE_QUERY.format(
+        items=ITEMS_NS,
+        resources=values('resource', annotations),
+        annotations=values('annotation', annotations),
+        target=removable('resource'),
+        selector=removable('target') + removable(
+            'resource', '{}, ?target'.format(others),
+        ),
+        body=removable('resource'),
+    )
+
 
 class ItemsAPIDownload(ItemsAPIRoot):
+    """
+    Export the items that are selected by the parameters of ItemsAPIRoot.
+
+    The `syntax` parameter is 'nt' for N-Triples (default) or 'nq' for
+    N-Quads; pass `gzip=1` to compress. GET streams the export page by
+    page. POST writes it to the media storage in the background instead,
+    for very large exports, and responds with the location of its status.
+    """
     def get(self, request, format=None, **kwargs):
-        data = super().get_graph(request, **kwargs)
-        file_content = data.serialize()
-        response = HttpResponse(file_content)
-        response['Content-Type'] = 'application/rdf+xml'
-        response['Content-Disposition'] ='attachment; filename="export.rdf"'
+        params, syntax, compress = export_options(request.query_params)
+        chunks = export_chunks(
+            params, syntax, compress, visible_creator(request),
+        )
+        content_type = EXPORT_SYNTAXES[syntax][0]
+        response = StreamingHttpResponse(
+            chunks, content_type=GZIP_CONTENT_TYPE if compress else content_type,
+        )
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+            export_filename('export', syntax, compress),
+        )
         return response
 
+    def post(self, request, format=None):
+        params, syntax, compress = export_options(request.query_params)
+        traversal_params(params)  # validate before going to the background
+        export = ItemExport.objects.create(
+            params=params,
+            syntax=syntax,
+            compress=compress,
+            visible_creator=visible_creator(request) or '',
+            creator=request.user,
+        )
+        export_items.delay(str(export.token))
+        location = reverse(
+            'item-export', kwargs={'token': export.token}, request=request,
+        )
+        return JsonResponse(
+            ItemExportSerializer(export).data,
+            status=HTTP_202_ACCEPTED,
+            headers={'Location': location},
+        )
+
+
+class ItemExportStatus(RetrieveAPIView):
+    """ Report the progress of a background export of the current user. """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ItemExportSerializer
+    lookup_field = 'token'
+
+    def get_queryset(self):
+        return ItemExport.objects.filter(creator=self.request.user)
+
+
+class ItemExportFile(ItemExportStatus):
+    """ Download a finished background export of the current user. """
+    def retrieve(self, request, *args, **kwargs):
+        export = self.get_object()
+        if export.status != ItemExport.DONE:
+            raise NotFound(EXPORT_NOT_READY_404)
+        return FileResponse(
+            default_storage.open(export.filename),
+            as_attachment=True,
+            filename=basename(export.filename),
+        )
+
 
 class ItemsAPISingular(RDFResourceView):
     """ API endpoint for fetching and changing individual subjects. """
@@ -237,10 +504,12 @@ class ItemsAPISingular(RDFResourceView):
         if len(added) == 0 and len(removed) == 0:
             # No changes, skip database manipulations and attribution
             return Response(existing)
-        save_snapshot(identifier, existing, request)
-        full_graph = self.graph()
-        full_graph -= removed
-        full_graph += added
+        # snapshot, removals and additions in one atomic round trip
+        self.graph().store.update(edit_update(
+            snapshot(identifier, existing, request), removed, added,
+        ))
+        index_annotations(related_annotations([identifier]) | {identifier})
+        bump_version(ITEMS_CACHE)
         return Response(existing - removed + added)
 
     def delete(self, request, format=None, **kwargs):
@@ -252,34 +521,101 @@ class ItemsAPISingular(RDFResourceView):
         creator = existing.value(identifier, DCTERMS.creator)
         if user != creator and not request.user.is_superuser:
             raise PermissionDenied(detail=MUST_BE_OWNER_403)
+        affected = related_annotations([identifier]) | {identifier}
         full_graph = self.graph()
         full_graph -= existing
+        index_annotations(affected)
+        bump_version(ITEMS_CACHE)
         return Response(existing)
 
 
+class AnnotationsOfSource(RDFView):
+    """
+    List the annotations of a source, ordered by their position.
+
+    The `offset` and `limit` parameters select a page of annotations; the
+    total number is in the X-Total-Count header. All annotations are
+    listed, including those of other users and automated annotations,
+    as in the SPARQL endpoint. Pass `own=true` to list only the
+    annotations of the current user.
+    """
+
+    def get(self, request, serial, format=None, **kwargs):
+        params = request.query_params
+        offset = max(optional_int(params.get('offset')) or 0, 0)
+        limit = optional_int(params.get('limit')) or ANNOTATIONS_PER_PAGE
+        limit = min(max(limit, 1), ANNOTATIONS_PER_PAGE)
+        creator = None
+        if params.get('own') == 'true':
+            creator, now = submission_info(request)
+        rows = annotations_of_source(source[str(serial)], creator)
+        page = rows[offset:offset + limit]
+        annotations = [URIRef(row.annotation) for row in page]
+        response = Response(describe_annotations(annotations))
+        response['X-Total-Count'] = rows.count()
+        return response
+
+
 class ItemsOfCategory(RDFView):
-    """ Given a category, get annotations of that category,
-    taking into account user permissions. """
+    """
+    Given a category, get annotations of that category,
+    taking into account user permissions.
+
+    Annotations are returned in order of their IRI, `limit` at a time.
+    Pass the IRI of the last annotation without the items namespace, such
+    as its serial, as `after` to get the next page. The total number of
+    annotations is in the X-Total-Count header and the next page, if any,
+    in a Link header.
+    """
     def graph(self):
         return graph()
 
-    def get_graph(self, request, category, **kwargs):
-        items = self.graph()
-        bindings = {'category': ontology[category]}
-        if not request.user.has_perm('rdflib_django.view_all_annotations'):
-            user, now = submission_info(request)
-            bindings['user'] = user
-            user_items = graph_from_triples(items.query(
-                ANNO_OF_CATEGORY_QUERY, initBindings=bindings, initNs=ANNO_NS)
+    def get(self, request, category, format=None, **kwargs):
+        params = request.query_params
+        after = Literal(ITEMS_NS + params.get('after', ''))
+        limit = optional_int(params.get('limit')) or ANNOTATION_CUTOFF
+        limit = min(max(limit, 1), MAX_ANNOTATIONS_OF_CATEGORY)
+        creator = visible_creator(request)
+        pattern = CATEGORY_PATTERN.format(
+            category=ontology[category].n3(),
+            creator='?annotation dcterms:creator {} .'.format(
+                creator.n3()) if creator else '',
+            prefix=ITEMS_NS,
+        )
+        page = graph_from_triples(self.graph().query(
+            ANNO_OF_CATEGORY_QUERY.format(
+                pattern=pattern, after=after.n3(), limit=limit,
+            ),
+            initNs=ANNO_NS,
+        ))
+        response = Response(page)
+        response['X-Total-Count'] = self.get_count(category, creator, pattern)
+        annotations = [
+            str(s) for s in set(page.subjects()) if s.startswith(ITEMS_NS)
+        ]
+        if len(annotations) == limit:
+            last = max(annotations)[len(ITEMS_NS):]
+            next_page = '{}?{}'.format(
+                request.build_absolute_uri(request.path),
+                urlencode({'after': last, 'limit': limit}),
             )
-        else:
-            user_items = Graph()
-            subjects = items.subjects(OA.hasBody, ontology[category])
-            for i, s in enumerate(subjects):
-                if i==ANNOTATION_CUTOFF:
-                    break
-                [user_items.add(triple) for triple in items.triples((s, None, None))]
-        return user_items
+            response['Link'] = '<{}>; rel="next"'.format(next_page)
+        return response
+
+    def get_count(self, category, creator, pattern):
+        """ Count the annotations of `category`, cached until items change. """
+        key = CATEGORY_COUNT_KEY.format(
+            get_version(ITEMS_CACHE), category, creator or '',
+        )
+        count = cache.get(key)
+        if count is None:
+            result = self.graph().query(
+                COUNT_OF_CATEGORY_QUERY.format(pattern=pattern),
+                initNs=ANNO_NS,
+            )
+            count = int(next(iter(result)).total)
+            cache.set(key, count, None)
+        return count
 
 
 class SemanticQueryViewSet(
@@ -1,13 +1,13 @@
 from datetime import date, datetime, timedelta, timezone
 from urllib.parse import urlencode
 
-from rdflib import Literal, Graph, BNode, URIRef
+from rdflib import Literal, Graph, BNode, URIRef, ConjunctiveGraph
 
 from rdf.ns import *
 from staff import namespace as STAFF
 from ontology import namespace as ONTO
 from . import namespace as ITEM
-from .constants import ITEMS_ROUTE
+from .constants import ITEMS_ROUTE, ITEMS_NS, ITEMS_HISTORY_NS
 from .views import *
 from .graph import graph
 
@@ -37,6 +37,23 @@ def test_is_unreserved():
     assert not is_unreserved((None, DCTERMS.type, None))
 
 
+def test_traversal_query(itemgraph):
+    def resources(p, o, t, r):
+        result = itemgraph.query(traversal_query(p, o, t, r))
+        return set(graph_from_triples(result).subjects())
+    assert resources(RDF.type, OA.Annotation, 0, 0) == {ITEM['7']}
+    assert resources(RDF.type, OA.Annotation, 1, 0) == {
+        ITEM['5'], ITEM['6'], ITEM['7'],
+    }
+    assert resources(RDF.type, OA.Annotation, 2, 0) == {
+        ITEM['1'], ITEM['4'], ITEM['5'], ITEM['6'], ITEM['7'],
+    }
+    assert resources(None, ITEM['4'], 0, 1) == {ITEM['5'], ITEM['7']}
+    assert resources(OA.start, Literal(22), 0, 2) == {
+        ITEM['4'], ITEM['5'], ITEM['7'],
+    }
+
+
 def test_sanitize(itemgraph):
     s = sanitize(itemgraph)
     assert ( ITEM['1'], RDF.type, OA.TextQuoteSelector )                  in s
@@ -49,6 +66,58 @@ def test_sanitize(itemgraph):
     assert ( ITEM['6'], DCTERMS.type, Literal('example data') )       not in s
 
 
+def test_edit_update(itemgraph):
+    store = ConjunctiveGraph()
+    items = store.get_context(URIRef(ITEMS_NS))
+    items += itemgraph
+    label = (ITEM['6'], SKOS.prefLabel, Literal('Margaret Blessington'))
+    new_label = (ITEM['6'], SKOS.prefLabel, Literal('Lady "Blessington"\n'))
+    snapshot = [(URIRef(ITEMS_HISTORY_NS + '1'), RDF.type, OA.Annotation)]
+    store.update(edit_update(snapshot, [label], [new_label]))
+    assert label not in items
+    assert new_label in items
+    assert len(items) == len(itemgraph)
+    assert set(store.get_context(URIRef(ITEMS_HISTORY_NS))) == set(snapshot)
+    assert edit_update([], [], []) == ''
+
+
+def test_bulk_delete_query(itemgraph):
+    store = ConjunctiveGraph()
+    items = store.get_context(URIRef(ITEMS_NS))
+    history = store.get_context(URIRef(ITEMS_HISTORY_NS))
+
+    def delete(user):
+        query = bulk_delete_query([ITEM['7']], user)
+        store.update(query, initNs=ANNO_NS)
+        return set(items.subjects())
+
+    items += itemgraph
+    other = ( ITEM['8'], SKOS.related, ITEM['6'] )
+    items.add(other)
+    assert delete(STAFF.tester) == {ITEM['6'], ITEM['8']}
+    items.remove(other)
+    items += itemgraph
+    parts = {ITEM['1'], ITEM['4'], ITEM['5'], ITEM['6']}
+    assert delete(STAFF.someone_else) == parts
+    items += itemgraph
+    shared = ( ITEM['9'], OA.hasTarget, ITEM['5'] )
+    items.add(shared)
+    assert delete(STAFF.tester) == {ITEM['1'], ITEM['4'], ITEM['5'], ITEM['9']}
+    items.remove(shared)
+    items += itemgraph
+    shared = ( ITEM['11'], OA.hasSelector, ITEM['4'] )
+    items.add(shared)
+    assert delete(STAFF.tester) == {ITEM['4'], ITEM['11']}
+    items.remove(shared)
+    items += itemgraph
+    snapshot = ( ITEM['10'], OA.hasSource, ITEM['6'] )
+    history.add(snapshot)
+    assert delete(STAFF.tester) == {ITEM['6']}
+    history.remove(snapshot)
+    items += itemgraph
+    assert delete(STAFF.tester) == set()
+
+
 def test_get_item_root(client, itemgraph_db):
     response = client.get('/' + ITEMS_ROUTE)
     data = Graph()
@@ -109,6 +178,64 @@ def test_post_item(auth_client, sparqlstore):
     assert abs(created - datetime.now(timezone.utc)) < timedelta(seconds=1)
 
 
+def test_batch_post(auth_client, sparqlstore):
+    annotation = BNode('annotation')
+    target = BNode('target')
+    input_graph = Graph()
+    for t in (
+        ( annotation, RDF.type, OA.Annotation ),
+        ( annotation, OA.hasTarget, target ),
+        ( target, RDF.type, OA.SpecificResource ),
+        ( target, DCTERMS.creator, STAFF.Statler ),
+    ):
+        input_graph.add(t)
+    plaintext = input_graph.serialize(format='json-ld')
+    url = '/{}batch'.format(ITEMS_ROUTE)
+    response = auth_client.post(
+        url, plaintext, 'application/ld+json',
+        HTTP_ACCEPT='application/ld+json',
+    )
+    assert response.status_code == 201
+    output_graph = Graph()
+    output_graph.parse(data=response.content, format='json-ld')
+    mapping = {
+        str(bnode): uri
+        for uri, bnode in output_graph.subject_objects(OWL.sameAs)
+    }
+    assert set(mapping) == {'annotation', 'target'}
+    new_annotation = mapping['annotation']
+    new_target = mapping['target']
+    stored = graph()
+    assert ( new_annotation, OA.hasTarget, new_target ) in stored
+    assert ( new_target, DCTERMS.creator, STAFF.tester ) in stored
+    assert ( new_target, DCTERMS.creator, STAFF.Statler ) not in stored
+    assert len(set(stored.triples((None, OWL.sameAs, None)))) == 0
+
+    input_graph.add(( target, OA.hasSource, BNode() ))
+    plaintext = input_graph.serialize(format='json-ld')
+    response = auth_client.post(url, plaintext, 'application/ld+json')
+    assert response.status_code == 400
+
+
+def test_batch_delete(auth_client, itemgraph_db):
+    url = '/{}batch'.format(ITEMS_ROUTE)
+    input_graph = Graph()
+    input_graph.add(( ITEM['36'], RDF.type, OA.Annotation ))
+    plaintext = input_graph.serialize(format='json-ld')
+    response = auth_client.delete(url, plaintext, 'application/ld+json')
+    assert response.status_code == 404
+
+    input_graph = Graph()
+    input_graph.add(( ITEM['7'], RDF.type, OA.Annotation ))
+    plaintext = input_graph.serialize(format='json-ld')
+    response = auth_client.delete(url, plaintext, 'application/ld+json')
+    assert response.status_code == 200
+    output_graph = Graph()
+    output_graph.parse(data=response.content, format='turtle')
+    assert ( ITEM['7'], OA.hasTarget, ITEM['5'] ) in output_graph
+    assert len(graph()) == 0
+
+
 def test_put_item(auth_client, itemgraph_db):
     g = graph()
     before = 22
@@ -172,3 +299,32 @@ def test_blanknodes_put(auth_client, sparqlstore):
     response, output_graph = submit_data(auth_client, override, 'put', 42)
     assert response.status_code == 400
     assert (None, None, Literal(BLANK_OBJECT_PREDICATE_400)) in output_graph
+
+
+def test_get_items_of_category(super_client, itemgraph_db):
+    url = '/{}{}'.format(ITEMS_ROUTE, 'reader')
+    response = super_client.get(url, {'limit': 1})
+    assert response['X-Total-Count'] == '1'
+    assert 'rel="next"' in response['Link']
+    data = Graph()
+    data.parse(data=response.content, format='turtle')
+    assert set(data.subjects()) == {ITEM['7']}
+
+    response = super_client.get(url, {'after': '7', 'limit': 1})
+    data = Graph()
+    data.parse(data=response.content, format='turtle')
+    assert len(data) == 0
+    assert not response.has_header('Link')
+
+
+def test_download(client, itemgraph_db):
+    query = urlencode({
+        'p': str(RDF.type),
+        'o': str(OA.TextPositionSelector),
+    })
+    response = client.get('/{}download?{}'.format(ITEMS_ROUTE, query))
+    assert response['Content-Type'] == 'application/n-triples'
+    data = Graph()
+    data.parse(data=b''.join(response.streaming_content), format='nt')
+    assert len(data) == 5
+    assert ITEM['4'] in set(data.subjects())
@@ -5,4 +5,6 @@ NLP_ONTOLOGY_NS = '{}{}#'.format(
     settings.RDF_NAMESPACE_ROOT, 'nlp-ontology')
 
 NLP_NS = 'https://read-it.hum.uu.nl/nlp-ontology'
-INSTANCE_NLP_NS = '{}nlp-ontology'.format(settings.RDF_NAMESPACE_ROOT)
\ No newline at end of file
+INSTANCE_NLP_NS = '{}nlp-ontology'.format(settings.RDF_NAMESPACE_ROOT)
+# Cache namespace of the rewritten NLP ontology, see readit.cache
+NLP_ONTOLOGY_CACHE = 'nlp-ontology'
@@ -2,7 +2,12 @@ from django.conf import settings
 from rdflib import Graph
 
 from ontology.fixture import replace_prefix
-from .constants import NLP_ONTOLOGY_NS, NLP_NS, INSTANCE_NLP_NS
+from readit.cache import get_version
+from .constants import NLP_ONTOLOGY_NS, NLP_NS, INSTANCE_NLP_NS, \
+    NLP_ONTOLOGY_CACHE
+
+# (version, graph) of the most recent result of cached_graph()
+_cached = (None, None)
 
 
 def graph():
@@ -14,3 +19,18 @@ def graph():
         g = Graph(settings.RDFLIB_STORE, NLP_ONTOLOGY_NS)
     g = replace_prefix(g, NLP_NS, INSTANCE_NLP_NS)
     return g
+
+
+def cached_graph():
+    """
+    Like graph(), but only rebuilt when NLP_ONTOLOGY_CACHE is bumped.
+
+    The same Graph is shared between requests, so do not modify it.
+    """
+    global _cached
+    version, g = _cached
+    current = get_version(NLP_ONTOLOGY_CACHE)
+    if g is None or version != current:
+        g = graph()
+        _cached = (current, g)
+    return g
@@ -1,9 +1,16 @@
+from django.conf import settings
+
 from rdf.views import RDFView
-from .graph import graph
+from readit.cache import VersionedCacheMixin
+from .constants import NLP_ONTOLOGY_CACHE
+from .graph import cached_graph
 
 
-class ListNlpOntology(RDFView):
+class ListNlpOntology(VersionedCacheMixin, RDFView):
     """ List the full ontology in RDF. """
+    cache_namespace = NLP_ONTOLOGY_CACHE
+    cache_local = True
+    cache_max_age = settings.RDF_GRAPH_MAX_AGE
 
     def graph(self):
-        return graph()
+        return cached_graph()
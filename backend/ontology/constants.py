@@ -21,3 +21,6 @@ OLD_SOURCE_PREFIX = 'http://readit.example/ontology/'
 SOURCE_PREFIX = 'http://dataforhistory.org/read-it-ongoing/'
 SOURCE_PROPERTY_PREFIX = SOURCE_PREFIX + 'property/'
 SOURCE_CLASS_PREFIX = SOURCE_PREFIX + 'class/'
+
+# Cache namespace of the rendered ontology, see readit.cache
+ONTOLOGY_CACHE = 'ontology'
@@ -13,21 +13,31 @@ from .constants import (OLD_SOURCE, OLD_SOURCE_PREFIX, ONTOLOGY_NS, SOURCE,
                         SOURCE_CLASS_PREFIX, SOURCE_FORMAT, SOURCE_PREFIX,
                         SOURCE_PROPERTY_PREFIX)
 
-REPARSE_FORMAT = 'n3'
-
 
 def replace_prefix(graph_in, prefix_in, prefix_out):
     """
-    Return a new graph in which SOURCE_PREFIX is replaced by ONTOLOGY_NS.
+    Return a new graph in which `prefix_in` is replaced by `prefix_out`.
 
-    This function works by serializing `graph_in` to bytes, textually
-    replacing the prefix and then parsing the result into a new Graph.
-    Not efficient; do not use for large graphs.
+    Every URIRef in `graph_in` that starts with `prefix_in` is rewritten
+    in a single pass over the triples. Namespace bindings are rewritten
+    in the same way. Literals are left alone.
     """
-    serialized = graph_in.serialize(format=REPARSE_FORMAT)
-    replaced = serialized.replace(prefix_in, prefix_out)
+    cut = len(prefix_in)
+    rewritten = {}
+
+    def rewrite(term):
+        if not isinstance(term, URIRef) or not term.startswith(prefix_in):
+            return term
+        if term not in rewritten:
+            rewritten[term] = URIRef(prefix_out + term[cut:])
+        return rewritten[term]
+
     graph_out = Graph()
-    graph_out.parse(data=replaced, format=REPARSE_FORMAT)
+    for abbreviation, namespace in graph_in.namespaces():
+        graph_out.bind(abbreviation, rewrite(namespace), replace=True)
+    graph_out += (
+        (rewrite(s), rewrite(p), rewrite(o)) for s, p, o in graph_in
+    )
     return graph_out
 
 
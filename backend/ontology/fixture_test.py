@@ -1,6 +1,6 @@
 from rdf.ns import DCTYPES, RDF, RDFS, SCHEMA, Namespace
 from rdf.utils import graph_from_triples
-from rdflib import Literal
+from rdflib import Literal, URIRef
 
 from .constants import ONTOLOGY_NS, SOURCE_PREFIX
 from .fixture import canonical_graph, replace_prefix
@@ -34,3 +34,14 @@ def test_canonical_graph():
     text = g.serialize(format='n3')
     assert ONTOLOGY_NS in text
     assert SOURCE_PREFIX == ONTOLOGY_NS or SOURCE_PREFIX not in text
+
+
+def test_replace_prefix_terms_only():
+    old_prefix = 'http://obsolete.info/'
+    new_prefix = 'http://fashionable.org/'
+    before = graph_with_prefix(old_prefix)
+    before.add((SCHEMA.Cat, RDFS.comment, Literal(old_prefix)))
+    before.bind('old', old_prefix)
+    after = replace_prefix(before, old_prefix, new_prefix)
+    assert (SCHEMA.Cat, RDFS.comment, Literal(old_prefix)) in after
+    assert dict(after.namespaces())['old'] == URIRef(new_prefix)
@@ -1,10 +1,16 @@
+from django.conf import settings
+
 from rdf.views import RDFView
+from readit.cache import VersionedCacheMixin
+from .constants import ONTOLOGY_CACHE
 from .graph import graph
-from nlp_ontology.graph import graph as nlp_graph
 
 
-class ListOntology(RDFView):
+class ListOntology(VersionedCacheMixin, RDFView):
     """ List the full ontology in RDF. """
+    cache_namespace = ONTOLOGY_CACHE
+    cache_local = True
+    cache_max_age = settings.RDF_GRAPH_MAX_AGE
 
     def graph(self):
         return graph()
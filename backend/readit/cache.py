@@ -0,0 +1,142 @@
+"""
+Versioned caching of rendered RDF responses.
+
+Each cached resource belongs to a namespace with a version number. The
+version is part of every cache key and of the ETag, so bumping it
+invalidates all cached renditions at once and makes clients that send
+a stale If-None-Match receive a full response again.
+
+Versions are stored in the database, so that a bump in one process (for
+example by the rdfmigrate command or a Celery task) is seen by all
+others, whatever the cache backend. The rendered content may be kept in
+a per-process cache; each process then renders every version once.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import urlencode
+
+from .models import CacheVersion
+
+CONTENT_KEY_PATTERN = 'content:{}:{}:{}:{}:{}'
+ETAG_PATTERN = '"{}-{}-{}-{}-{}"'
+
+# Renditions that are also kept in process, as {namespace: (version, {key: content})}
+_local = {}
+
+
+def get_version(namespace):
+    """ Return the current version of `namespace`, initializing if needed. """
+    # Start from the clock rather than from 1, so that content which is
+    # still cached from before a database reset is never served again.
+    row, created = CacheVersion.objects.get_or_create(
+        namespace=namespace, defaults={'version': int(time.time() * 1000)},
+    )
+    return row.version
+
+
+def bump_version(namespace):
+    """ Invalidate everything that was cached under `namespace`. """
+    rows = CacheVersion.objects.filter(namespace=namespace)
+    if not rows.update(version=F('version') + 1):
+        # Nothing was cached yet, so initializing is enough.
+        return get_version(namespace)
+    return rows.get().version
+
+
+def get_local(namespace, version, key):
+    """ Return in-process content for `key` if it is still current. """
+    local_version, renditions = _local.get(namespace, (None, {}))
+    if local_version != version:
+        return None
+    return renditions.get(key)
+
+
+def set_local(namespace, version, key, content):
+    """ Keep `content` in process, dropping renditions of older versions. """
+    local_version, renditions = _local.get(namespace, (None, {}))
+    if local_version != version:
+        renditions = {}
+        _local[namespace] = (version, renditions)
+    renditions[key] = content
+
+
+def etag_matches(request, etag):
+    """ Check whether the If-None-Match header of `request` lists `etag`. """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = (tag.strip() for tag in header.split(','))
+    return any(tag in ('*', etag) for tag in candidates)
+
+
+class VersionedCacheMixin:
+    """
+    Mixin for RDFView that caches the rendered response of GET requests.
+
+    Set `cache_namespace` to the namespace that is bumped whenever the
+    underlying graph changes. The rendered content is cached separately
+    per renderer format, per host, since some graphs contain URIs that
+    are built from the request, and per value of the query parameters
+    in `cache_params`; other parameters do not affect the cache, so list
+    every parameter that the view reads. Set `cache_local` to also keep
+    the rendered content in process and `cache_max_age` to let clients
+    reuse responses without revalidating.
+    """
+    cache_namespace = None
+    cache_params = ()
+    cache_timeout = None  # entries are invalidated by bumping the version
+    cache_local = False
+    cache_max_age = None
+
+    def get(self, request, format=None, **kwargs):
+        renderer = request.accepted_renderer
+        version = get_version(self.cache_namespace)
+        variant = (
+            self.cache_namespace, version, renderer.format,
+            request.get_host(), self.get_cache_params(request),
+        )
+        etag = ETAG_PATTERN.format(*variant)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            key = CONTENT_KEY_PATTERN.format(*variant)
+            content = self.get_content(request, version, key, **kwargs)
+            response = HttpResponse(content, content_type='{}; charset={}'.format(
+                renderer.media_type, renderer.charset or 'utf-8',
+            ))
+        response['ETag'] = etag
+        if self.cache_max_age is not None:
+            patch_cache_control(response, max_age=self.cache_max_age)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def get_cache_params(self, request):
+        """ Encode the values of `cache_params` that occur in `request`. """
+        return urlencode([
+            (name, request.GET[name])
+            for name in self.cache_params if name in request.GET
+        ])
+
+    def get_content(self, request, version, key, **kwargs):
+        """ Return the rendered content from the cache or render it. """
+        namespace = self.cache_namespace
+        content = self.cache_local and get_local(namespace, version, key)
+        if content:
+            return content
+        content = cache.get(key)
+        if content is None:
+            renderer = request.accepted_renderer
+            content = renderer.render(
+                self.get_graph(request, **kwargs),
+                request.accepted_media_type,
+                self.get_renderer_context(),
+            )
+            cache.set(key, content, self.cache_timeout)
+        if self.cache_local:
+            set_local(namespace, version, key, content)
+        return content
@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from rdflib import Graph, Literal
+
+from rdf.ns import RDFS
+from rdf.views import RDFView
+from staff import namespace as staff
+
+from .cache import *
+from .models import CacheVersion
+
+NAMESPACE = 'cache-test'
+
+
+class CountingView(VersionedCacheMixin, RDFView):
+    cache_namespace = NAMESPACE
+    computed = 0
+
+    def get_graph(self, request, **kwargs):
+        CountingView.computed += 1
+        g = Graph()
+        g.add((staff.tester, RDFS.label, Literal(CountingView.computed)))
+        return g
+
+
+def test_bump_version(db):
+    before = get_version(NAMESPACE)
+    assert get_version(NAMESPACE) == before
+    after = bump_version(NAMESPACE)
+    assert after != before
+    assert get_version(NAMESPACE) == after
+    assert CacheVersion.objects.get(namespace=NAMESPACE).version == after
+
+
+def test_etag_matches():
+    factory = RequestFactory()
+    assert not etag_matches(factory.get('/'), '"a"')
+    assert etag_matches(factory.get('/', HTTP_IF_NONE_MATCH='"a"'), '"a"')
+    assert etag_matches(factory.get('/', HTTP_IF_NONE_MATCH='"b", "a"'), '"a"')
+    assert etag_matches(factory.get('/', HTTP_IF_NONE_MATCH='*'), '"a"')
+    assert not etag_matches(factory.get('/', HTTP_IF_NONE_MATCH='"b"'), '"a"')
+
+
+def test_cached_view(db):
+    factory = RequestFactory()
+    view = CountingView.as_view()
+    bump_version(NAMESPACE)
+    computed = CountingView.computed
+    first = view(factory.get('/'))
+    second = view(factory.get('/'))
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert CountingView.computed == computed + 1
+    etag = first['ETag']
+    assert view(factory.get('/', HTTP_IF_NONE_MATCH=etag)).status_code == 304
+    bump_version(NAMESPACE)
+    third = view(factory.get('/', HTTP_IF_NONE_MATCH=etag))
+    assert third.status_code == 200
+    assert third['ETag'] != etag
+    assert CountingView.computed == computed + 2
+
+
+def test_cache_params(db):
+    factory = RequestFactory()
+    view = CountingView.as_view(cache_params=('page',))
+    bump_version(NAMESPACE)
+    computed = CountingView.computed
+    first = view(factory.get('/', {'page': 1}))
+    # parameters that the view does not read share the cached content
+    same = view(factory.get('/', {'page': 1, 'other': 'x'}))
+    assert same.content == first.content
+    assert same['ETag'] == first['ETag']
+    assert CountingView.computed == computed + 1
+    second = view(factory.get('/', {'page': 2}))
+    assert second['ETag'] != first['ETag']
+    assert CountingView.computed == computed + 2
+    etag = first['ETag']
+    request = factory.get('/', {'page': 2}, HTTP_IF_NONE_MATCH=etag)
+    assert view(request).status_code == 200
+
+
+class LocalCountingView(CountingView):
+    cache_local = True
+    cache_max_age = 60
+
+
+def test_local_cache(db):
+    factory = RequestFactory()
+    view = LocalCountingView.as_view()
+    version = bump_version(NAMESPACE)
+    computed = CountingView.computed
+    first = view(factory.get('/'))
+    assert 'max-age=60' in first['Cache-Control']
+    # without the shared copy, the content is still served from process memory
+    cache.delete(CONTENT_KEY_PATTERN.format(
+        NAMESPACE, version, 'ttl', 'testserver', '',
+    ))
+    second = view(factory.get('/'))
+    assert second.content == first.content
+    assert CountingView.computed == computed + 1
+    bump_version(NAMESPACE)
+    view(factory.get('/'))
+    assert CountingView.computed == computed + 2
@@ -25,3 +25,37 @@ def get_elasticsearch_client():
         pass
     client = Elasticsearch([node], **kwargs)
     return client
+
+
+
+# Fields that hold the full text of a source, which can be megabytes long
+FULLTEXT_FIELDS = ['text', 'text_*']
+
+
+def source_filter(includes=(), with_text=False):
+    '''
+    Return the `_source` option that selects the document fields to return.
+
+    Only the fields in `includes` are returned; if there are none, no
+    `_source` is returned at all. The full text fields are left out even
+    if they match `includes`, unless `with_text` is true.
+    '''
+    if not includes:
+        return with_text
+    source = {'includes': list(includes)}
+    if not with_text:
+        source['excludes'] = FULLTEXT_FIELDS
+    return source
+
+
+def search_body(query, includes=(), with_text=False, **options):
+    '''
+    Build the body of a search request for `query`.
+
+    Hits only carry the fields in `includes`, see `source_filter`, so the
+    full text only travels when a caller explicitly asks for it. Other
+    `options`, such as `highlight` or `sort`, are added as they are.
+    '''
+    return dict(
+        query=query, _source=source_filter(includes, with_text), **options,
+    )
@@ -0,0 +1,15 @@
+from .elasticsearch import search_body, FULLTEXT_FIELDS
+
+
+def test_search_body():
+    query = {'match_all': {}}
+    assert search_body(query) == {'query': query, '_source': False}
+    body = search_body(query, ['id', 'title'], size=0)
+    assert body['_source'] == {
+        'includes': ['id', 'title'],
+        'excludes': FULLTEXT_FIELDS,
+    }
+    assert body['size'] == 0
+    body = search_body(query, ['id', 'text'], with_text=True)
+    assert body['_source'] == {'includes': ['id', 'text']}
+    assert search_body(query, with_text=True)['_source'] is True
@@ -0,0 +1,38 @@
+"""
+The rdfmigrate command of rdf, extended with cache invalidation.
+
+RDF migrations change the ontology, the vocabulary and possibly other
+graphs, so afterwards all cached renditions of those graphs are
+invalidated (see readit.cache). The command also reports how many round
+trips to the triplestore the migrations took (see readit.sparqlstore).
+"""
+
+from rdf.management.commands import rdfmigrate
+
+from readit.cache import bump_version
+from readit.metrics import observe
+from readit.sparqlstore import recording
+from ontology.constants import ONTOLOGY_CACHE
+from vocab.constants import VOCAB_CACHE
+from nlp_ontology.constants import NLP_ONTOLOGY_CACHE
+from sources.constants import SOURCES_LISTING_CACHE
+
+MIGRATED_CACHES = (
+    ONTOLOGY_CACHE,
+    VOCAB_CACHE,
+    NLP_ONTOLOGY_CACHE,
+    SOURCES_LISTING_CACHE,
+)
+
+
+class Command(rdfmigrate.Command):
+    def handle(self, *args, **options):
+        with recording() as round_trips:
+            super().handle(*args, **options)
+        observe(round_trips)
+        self.stdout.write('{} round trips to the triplestore in {:.1f}s.'.format(
+            len(round_trips), sum(trip.seconds for trip in round_trips),
+        ))
+        for namespace in MIGRATED_CACHES:
+            bump_version(namespace)
+        self.stdout.write('Invalidated cached graphs.')
@@ -0,0 +1,117 @@
+"""
+In-process metrics of the round trips to the triplestore and of the
+full text fetches from Elasticsearch.
+
+The counters are kept per process and exposed in the Prometheus text
+format by SPARQLMetricsView. Each worker process reports its own
+numbers, so scrape every worker or sum them in Prometheus.
+"""
+
+from collections import Counter
+from threading import Lock
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+PREFIX = 'readit'
+METRICS = (
+    # (name, type, help)
+    ('sparql_round_trips_total', 'counter',
+     'Queries and updates sent to the triplestore.'),
+    ('sparql_seconds_total', 'counter',
+     'Time spent waiting for the triplestore.'),
+    ('sparql_result_size_total', 'counter',
+     'Result rows or triples received from the triplestore.'),
+    ('sparql_requests_total', 'counter',
+     'HTTP requests, by view.'),
+    ('sparql_request_round_trips_total', 'counter',
+     'Round trips to the triplestore made by HTTP requests, by view.'),
+    ('sparql_request_round_trips_max', 'gauge',
+     'Highest number of round trips of a single HTTP request, by view.'),
+    ('fulltext_fetches_total', 'counter',
+     'Batches of full texts fetched from Elasticsearch.'),
+    ('fulltext_seconds_total', 'counter',
+     'Time spent fetching full texts from Elasticsearch.'),
+    ('fulltext_texts_total', 'counter',
+     'Full texts fetched from Elasticsearch.'),
+)
+
+_lock = Lock()
+_values = {name: Counter() for (name, type, help) in METRICS}
+
+
+def observe(round_trips, view=None):
+    """
+    Add recorded `round_trips` to the metrics.
+
+    Pass the name of the `view` if the round trips were made by a single
+    HTTP request.
+    """
+    with _lock:
+        for trip in round_trips:
+            labels = (('kind', trip.kind),)
+            _values['sparql_round_trips_total'][labels] += 1
+            _values['sparql_seconds_total'][labels] += trip.seconds
+            _values['sparql_result_size_total'][labels] += trip.size or 0
+        if view is not None:
+            labels = (('view', view),)
+            _values['sparql_requests_total'][labels] += 1
+            _values['sparql_request_round_trips_total'][labels] += len(
+                round_trips
+            )
+            maximum = _values['sparql_request_round_trips_max']
+            maximum[labels] = max(maximum[labels], len(round_trips))
+
+
+def observe_fulltext(seconds, texts):
+    """ Add a fetch of `texts` full texts that took `seconds` to the metrics. """
+    with _lock:
+        _values['fulltext_fetches_total'][()] += 1
+        _values['fulltext_seconds_total'][()] += seconds
+        _values['fulltext_texts_total'][()] += texts
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics():
+    """ Return the metrics in the Prometheus text exposition format. """
+    lines = []
+    with _lock:
+        for name, type, help in METRICS:
+            full_name = '{}_{}'.format(PREFIX, name)
+            lines.append('# HELP {} {}'.format(full_name, help))
+            lines.append('# TYPE {} {}'.format(full_name, type))
+            for labels, value in sorted(_values[name].items()):
+                label_text = ','.join(
+                    '{}="{}"'.format(key, escape(text)) for key, text in labels
+                )
+                lines.append('{}{} {}'.format(
+                    full_name, label_text and '{' + label_text + '}', value,
+                ))
+    return '\n'.join(lines) + '\n'
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):  # error response
+            return str(data.get('detail', ''))
+        return data
+
+
+class SPARQLMetricsView(APIView):
+    """ Expose the metrics to Prometheus (administrators only). """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request, format=None):
+        return Response(render_metrics(), content_type=(
+            'text/plain; version=0.0.4; charset=utf-8'
+        ))
@@ -0,0 +1,76 @@
+"""
+Report the round trips to the triplestore of each request.
+
+Add 'readit.middleware.SPARQLInstrumentationMiddleware' to MIDDLEWARE
+and use readit.sparqlstore.InstrumentedSPARQLUpdateStore as the
+RDFLIB_STORE. Every request that talks to the triplestore then
+
+ - adds its round trips to the metrics in readit.metrics;
+ - writes a structured line to the readit.sparql logger;
+ - in DEBUG mode, reports the number and duration of its round trips
+   in the X-SPARQL-Round-Trips, X-SPARQL-Time and X-SPARQL-Repeats
+   response headers.
+
+Round trips of streaming responses, which happen after the view has
+returned, are not included.
+"""
+
+import json
+import logging
+from collections import Counter
+
+from django.conf import settings
+
+from .metrics import observe
+from .sparqlstore import recording
+
+logger = logging.getLogger('readit.sparql')
+
+
+def summarize(round_trips):
+    """ Aggregate round trips by kind and fingerprint, most frequent first. """
+    totals = Counter()
+    seconds = Counter()
+    sizes = Counter()
+    for trip in round_trips:
+        key = (trip.kind, trip.fingerprint)
+        totals[key] += 1
+        seconds[key] += trip.seconds
+        sizes[key] += trip.size or 0
+    return [{
+        'kind': kind,
+        'fingerprint': fingerprint,
+        'count': count,
+        'ms': round(seconds[(kind, fingerprint)] * 1000, 1),
+        'size': sizes[(kind, fingerprint)],
+    } for ((kind, fingerprint), count) in totals.most_common()]
+
+
+class SPARQLInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with recording() as round_trips:
+            response = self.get_response(request)
+        if not round_trips:
+            return response
+        match = request.resolver_match
+        view = match.view_name if match else ''
+        observe(round_trips, view)
+        total_ms = round(sum(trip.seconds for trip in round_trips) * 1000, 1)
+        summary = summarize(round_trips)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'round_trips': len(round_trips),
+            'ms': total_ms,
+            'queries': summary,
+        }))
+        if settings.DEBUG:
+            response['X-SPARQL-Round-Trips'] = len(round_trips)
+            response['X-SPARQL-Time'] = total_ms
+            response['X-SPARQL-Repeats'] = summary[0]['count']
+        return response
@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """ Current version of a cache namespace, see readit.cache. """
+    namespace = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return '{} {}'.format(self.namespace, self.version)
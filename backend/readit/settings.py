@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 import os
 
-from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+from readit.sparqlstore import InstrumentedSPARQLUpdateStore
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -35,24 +35,50 @@ RDF_NAMESPACE_ROOT = 'http://{}:8000/'.format(RDF_NAMESPACE_HOST)
 
 ALLOWED_HOSTS = []
 
-# Default store for our graphs.
+# Default store for our graphs. It records its round trips per request,
+# see readit.middleware, and pools its connections, see readit.sparqlstore.
 TRIPLESTORE_NAMESPACE = 'readit'
 TRIPLESTORE_BASE_URL = os.getenv('READIT_TRIPLESTORE_BASE_URL', 'http://localhost:9999/blazegraph')
 TRIPLESTORE_SPARQL_ENDPOINT = f'{TRIPLESTORE_BASE_URL}/namespace/{TRIPLESTORE_NAMESPACE}/sparql'
-RDFLIB_STORE = SPARQLUpdateStore(
+# Connections to the triplestore are kept alive and shared by the threads
+# of a process, up to TRIPLESTORE_POOL_SIZE connections.
+TRIPLESTORE_POOL_SIZE = 10
+TRIPLESTORE_TIMEOUT = (5, 300)  # seconds to connect, seconds to wait for data
+TRIPLESTORE_RETRIES = 3  # on server errors, with exponential backoff
+TRIPLESTORE_BACKOFF = 0.5  # seconds before the first retry
+RDFLIB_STORE = InstrumentedSPARQLUpdateStore(
     query_endpoint=TRIPLESTORE_SPARQL_ENDPOINT,
     update_endpoint=TRIPLESTORE_SPARQL_ENDPOINT,
+    pool_size=TRIPLESTORE_POOL_SIZE,
+    timeout=TRIPLESTORE_TIMEOUT,
+    retries=TRIPLESTORE_RETRIES,
+    backoff=TRIPLESTORE_BACKOFF,
 )
 
 # Celery configuration
 CELERY_BROKER_HOST = os.getenv('READIT_BROKER_HOST', '')
 CELERY_BROKER_URL = f'amqp://{CELERY_BROKER_HOST}'
 CELERY_BACKEND = 'amqp'
-# set task timeout to more than 24 hours - make sure long tasks won't be aborted
-CELERY_TASK_TIME_LIMIT = 86401
+# no task waits for external services, so an hour is plenty, except for
+# item exports, see EXPORT_TIME_LIMIT
+CELERY_TASK_TIME_LIMIT = 3600
+# outstanding IRISA jobs are checked and expired item exports deleted by
+# periodic tasks, which require celery beat, e.g. `celery -A readit worker -B`
+CELERY_BEAT_SCHEDULE = {
+    'poll-automated-annotations': {
+        'task': 'sources.tasks.poll_automated_annotations',
+        'schedule': 60,
+    },
+    'delete-expired-exports': {
+        'task': 'items.tasks.delete_expired_exports',
+        'schedule': 60 * 60,
+    },
+}
 
 
 IRISA_WAIT = 300  # wait for 5 minutes between requests to Irisa API
+IRISA_FIRST_WAIT = 10  # make sure the result url exists before polling
+IRISA_REQUEST_TIMEOUT = 30
 IRISA_URL = 'https://allgo18.inria.fr/api/v1'
 # set IRISA_TOKEN as env variable
 IRISA_TOKEN = os.environ.get('IRISA_TOKEN')
@@ -77,6 +103,8 @@ INSTALLED_APPS = [
     'rest_auth.registration',
     'rdflib_django',
     'corsheaders',
+    # readit overrides the rdfmigrate command of rdf, so it must come first
+    'readit',
     'rdf',
     'vocab',
     'staff',
@@ -102,6 +130,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'livereload.middleware.LiveReloadScript',
+    'readit.middleware.SPARQLInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'readit.urls'
@@ -147,6 +176,26 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Rendered graphs are cached with a version that is bumped on changes
+# (see readit.cache). The versions are kept in the database, so bumps
+# reach all processes. With a per-process backend, each worker process
+# renders every version once; a shared backend such as memcached avoids
+# that.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'readit',
+    }
+}
+
+# How long clients may reuse the ontology and vocabulary without
+# revalidating. They only change through the rdfmigrate command.
+RDF_GRAPH_MAX_AGE = 60 * 60 * 24
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -208,6 +257,8 @@ TESTRUNNER_FILE_PATH = os.getenv('READIT_TESTRUNNER_PATH', '')
 # https://docs.djangoproject.com/en/3.2/topics/files/
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+EXPORT_EXPIRY = 60 * 60 * 24  # seconds that item exports are kept
+EXPORT_TIME_LIMIT = 60 * 60 * 24  # seconds that writing an item export may take
 
 # Settings for (email) registration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -223,10 +274,22 @@ SILENCED_SYSTEM_CHECKS = ['urls.W002']
 ES_HOST = os.getenv('READIT_ES_HOST', 'localhost')
 ES_PORT = "9200"
 ES_ALIASNAME = "readit"
+# Store new source texts as passages (child documents) of at most
+# ES_PASSAGE_SIZE characters, instead of as a single document. This
+# requires the join field mapping that is described in the README.
+ES_PASSAGES = False
+ES_PASSAGE_SIZE = 10000
+# Highlighter of the full text fields. Indices with the mapping of the
+# reindex_sources command store term vectors, which the unified
+# highlighter uses instead of analysing the texts again. The fast vector
+# highlighter ('fvh') requires them, so only choose it after reindexing.
+ES_HIGHLIGHTER = 'unified'
 
 
 RESULTS_PER_PAGE = 2
 
+STAFF_PER_PAGE = 100  # users per page of the staff listing, if paginated
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
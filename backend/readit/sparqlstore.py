@@ -0,0 +1,360 @@
+"""
+The triplestore connection, pooled and instrumented per request.
+
+PooledSPARQLUpdateStore talks to the SPARQL endpoint over keep-alive
+connections from a shared pool and asks for the result format that is
+fastest to parse for each kind of query. InstrumentedSPARQLUpdateStore
+additionally records every round trip while a recording is active (see
+`recording`). The SPARQLInstrumentationMiddleware in readit.middleware
+keeps one recording per request and reports it through headers, log
+lines and the metrics view in readit.metrics.
+"""
+
+import codecs
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha1
+from io import BytesIO
+from threading import local
+from time import perf_counter
+from typing import NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rdflib import BNode, Graph
+from rdflib.query import Result
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser, ParseError
+from rdflib.plugins.stores.sparqlconnector import (SPARQLConnectorException,
+                                                   _response_mime_types)
+from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+
+QUERY = 'query'
+UPDATE = 'update'
+
+# Parts of a query that vary between otherwise identical queries.
+IRI_PATTERN = re.compile(r'<[^<>\s]*>')
+STRING_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+NUMBER_PATTERN = re.compile(r'(?<![\w?$])[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+SPACE_PATTERN = re.compile(r'\s+')
+FINGERPRINT_LENGTH = 12
+
+# Server errors after which a query is tried again.
+RETRY_STATUSES = (500, 502, 503, 504)
+QUERY_ERROR = 'The triplestore rejected the query ({}): {}'
+SPARQL_QUERY_TYPE = 'application/sparql-query'
+SPARQL_UPDATE_TYPE = 'application/sparql-update'
+FORM_TYPE = 'application/x-www-form-urlencoded'
+
+# Result formats by query form. JSON is much faster to parse than the
+# SPARQL XML that rdflib asks for by default, and N-Triples than RDF/XML.
+NTRIPLES_TYPES = ('application/n-triples', 'text/plain')
+NTRIPLES_ACCEPT = 'application/n-triples, text/plain;q=0.9, application/rdf+xml;q=0.5'
+JSON_ACCEPT = 'application/sparql-results+json, application/sparql-results+xml;q=0.5'
+GRAPH_FORMS = ('CONSTRUCT', 'DESCRIBE')
+RESULT_FORMATS = {
+    'SELECT': JSON_ACCEPT,
+    'ASK': JSON_ACCEPT,
+    'CONSTRUCT': NTRIPLES_ACCEPT,
+    'DESCRIBE': NTRIPLES_ACCEPT,
+}
+# BASE, PREFIX and comments that may precede the query form.
+PROLOGUE_PATTERN = re.compile(
+    r'(?:\s+|#[^\n]*|BASE\s*<[^>]*>|PREFIX\s+[\w.-]*:\s*<[^>]*>)*',
+    re.IGNORECASE,
+)
+FORM_PATTERN = re.compile(r'(SELECT|ASK|CONSTRUCT|DESCRIBE)\b', re.IGNORECASE)
+CHUNK_SIZE = 64 * 1024
+
+_recording = ContextVar('sparql_recording', default=None)
+
+
+class RoundTrip(NamedTuple):
+    """ A single query or update that was sent to the SPARQL endpoint. """
+    kind: str
+    fingerprint: str
+    seconds: float
+    size: Optional[int]  # result rows or triples; None for updates and errors
+
+
+def fingerprint(text):
+    """
+    Identify the shape of a query, ignoring IRIs, literals and layout.
+
+    Queries that only differ in the resources that they are about get the
+    same fingerprint, so repeated fingerprints reveal N+1 patterns.
+    """
+    shape = IRI_PATTERN.sub('<>', text)
+    shape = STRING_PATTERN.sub('""', shape)
+    shape = NUMBER_PATTERN.sub('0', shape)
+    shape = SPACE_PATTERN.sub(' ', shape).strip()
+    return sha1(shape.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+@contextmanager
+def recording():
+    """
+    Record the round trips to the triplestore within a block.
+
+    Yields the list to which a RoundTrip is appended for each query and
+    update. Recordings do not nest; the innermost one receives all.
+    """
+    round_trips = []
+    token = _recording.set(round_trips)
+    try:
+        yield round_trips
+    finally:
+        _recording.reset(token)
+
+
+def record(kind, text, start, size):
+    round_trips = _recording.get()
+    if round_trips is not None:
+        round_trips.append(RoundTrip(
+            kind, fingerprint(text), perf_counter() - start, size,
+        ))
+
+
+def query_form(query):
+    """ Return SELECT, ASK, CONSTRUCT or DESCRIBE for `query`, None if unknown. """
+    start = PROLOGUE_PATTERN.match(query).end()
+    match = FORM_PATTERN.match(query, start)
+    return match and match.group(1).upper()
+
+
+class _LastTriple:
+    """ Sink for W3CNTriplesParser that keeps only the latest triple. """
+    triple_ = None
+
+    def triple(self, s, p, o):
+        self.triple_ = (s, p, o)
+
+
+def iter_ntriples(chunks):
+    """
+    Parse N-Triples from an iterable of byte chunks, one triple at a time.
+
+    Only the current line is kept in memory, so the triples can be
+    consumed while the document is still being received.
+    """
+    sink = _LastTriple()
+    parser = W3CNTriplesParser(sink)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    bnodes = {}
+    rest = ''
+    for chunk in chunks:
+        lines = (rest + decoder.decode(chunk)).split('\n')
+        rest = lines.pop()
+        for line in lines:
+            triple = _parse_line(parser, sink, line, bnodes)
+            if triple:
+                yield triple
+    triple = _parse_line(parser, sink, rest + decoder.decode(b'', True), bnodes)
+    if triple:
+        yield triple
+
+
+def _parse_line(parser, sink, line, bnodes):
+    sink.triple_ = None
+    parser.line = line.rstrip('\r')
+    try:
+        parser.parseline(bnode_context=bnodes)
+    except ParseError:
+        raise ParseError('Invalid line: {}'.format(line))
+    return sink.triple_
+
+
+def check_response(response):
+    """ Raise if the endpoint rejected a query, else return the content type. """
+    if 400 <= response.status_code < 500:
+        raise ValueError(QUERY_ERROR.format(
+            response.status_code, response.text,
+        ))
+    response.raise_for_status()
+    return response.headers['Content-Type'].split(';')[0]
+
+
+class PooledSPARQLUpdateStore(SPARQLUpdateStore):
+    """
+    SPARQLUpdateStore that keeps its connections to the endpoint alive.
+
+    Up to `pool_size` connections are kept open and shared by all
+    threads, while each thread uses its own requests session. `timeout`
+    is passed to requests, i.e., seconds or (connect, read) seconds.
+    Unless `negotiate` is false, results of SELECT and ASK queries are
+    requested as SPARQL JSON and those of CONSTRUCT and DESCRIBE queries
+    as N-Triples, which are parsed while they are received; the
+    `returnFormat` only applies to other queries. Queries are retried up
+    to `retries` times with exponential `backoff` on server errors.
+    Updates may not be idempotent, so they are only retried when no
+    connection could be made. Responses are gzip-compressed if the
+    endpoint supports it.
+
+    Edits that are pending a commit are kept per thread as well, so that
+    threads never commit each other's edits.
+    """
+
+    def __init__(self, *args, pool_size=10, timeout=None, retries=3,
+                 backoff=0.5, negotiate=True, **kwargs):
+        self._local = local()
+        self.timeout = timeout
+        self.negotiate = negotiate
+        self._query_adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(['GET', 'POST']),
+                raise_on_status=False,
+            ),
+        )
+        self._update_adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=Retry(
+                total=retries,
+                connect=retries,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=backoff,
+            ),
+        )
+        super().__init__(*args, **kwargs)
+
+    @property
+    def _edits(self):
+        return getattr(self._local, 'edits', None)
+
+    @_edits.setter
+    def _edits(self, edits):
+        self._local.edits = edits
+
+    def _session(self, name, adapter):
+        """ Return this thread's session that uses `adapter`. """
+        session = getattr(self._local, name, None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            setattr(self._local, name, session)
+        return session
+
+    def _request_args(self, accept, params):
+        headers = dict(self.kwargs.get('headers', {}))
+        headers['Accept'] = accept
+        return {
+            'params': {**self.kwargs.get('params', {}), **params},
+            'headers': headers,
+            'timeout': self.timeout,
+        }
+
+    def _send_query(self, query, default_graph=None):
+        """ Send `query`, return its form and the response as a stream. """
+        if not self.query_endpoint:
+            raise SPARQLConnectorException('Query endpoint not set!')
+        self._queries += 1
+        session = self._session('query_session', self._query_adapter)
+        params = {}
+        # Graph.query passes a useless BNode as the default graph
+        if default_graph is not None and type(default_graph) != BNode:
+            params['default-graph-uri'] = default_graph
+        form = query_form(query) if self.negotiate else None
+        accept = RESULT_FORMATS.get(form, _response_mime_types[self.returnFormat])
+        args = self._request_args(accept, params)
+        if self.method == 'GET':
+            args['params']['query'] = query
+            response = session.get(self.query_endpoint, stream=True, **args)
+        elif self.method == 'POST':
+            args['headers']['Content-Type'] = SPARQL_QUERY_TYPE
+            response = session.post(
+                self.query_endpoint, data=query.encode('utf-8'), stream=True,
+                **args,
+            )
+        else:  # POST_FORM
+            args['headers']['Content-Type'] = FORM_TYPE
+            form_data = {**args.pop('params'), 'query': query}
+            response = session.post(
+                self.query_endpoint, data=form_data, stream=True, **args,
+            )
+        return form, response
+
+    def _query(self, query, default_graph=None, named_graph=None):
+        form, response = self._send_query(query, default_graph)
+        with response:
+            content_type = check_response(response)
+            if content_type in NTRIPLES_TYPES and form in GRAPH_FORMS:
+                result = Result(form)
+                result.graph = Graph()
+                result.graph.addN(
+                    (s, p, o, result.graph) for (s, p, o) in
+                    iter_ntriples(response.iter_content(CHUNK_SIZE))
+                )
+                return result
+            return Result.parse(
+                BytesIO(response.content), content_type=content_type,
+            )
+
+    def iter_construct(self, query, default_graph=None):
+        """
+        Run a CONSTRUCT or DESCRIBE `query` and yield its triples.
+
+        Unlike `query`, the result is not collected in a graph: triples
+        are yielded while the response is received, so memory use does
+        not depend on the size of the result.
+        """
+        form, response = self._send_query(query, default_graph)
+        with response:
+            content_type = check_response(response)
+            if content_type in NTRIPLES_TYPES:
+                yield from iter_ntriples(response.iter_content(CHUNK_SIZE))
+                return
+            result = Result.parse(
+                BytesIO(response.content), content_type=content_type,
+            )
+        yield from result.graph
+
+    def _update(self, update):
+        if not self.update_endpoint:
+            raise SPARQLConnectorException('Update endpoint not set!')
+        self._updates += 1
+        session = self._session('update_session', self._update_adapter)
+        args = self._request_args(_response_mime_types[self.returnFormat], {})
+        args['headers']['Content-Type'] = SPARQL_UPDATE_TYPE
+        response = session.post(
+            self.update_endpoint, data=update.encode('utf-8'), **args,
+        )
+        response.raise_for_status()
+
+
+class InstrumentedSPARQLUpdateStore(PooledSPARQLUpdateStore):
+    """ SPARQLUpdateStore that records its round trips, see `recording`. """
+
+    def _query(self, query, *args, **kwargs):
+        start = perf_counter()
+        size = None
+        try:
+            result = super()._query(query, *args, **kwargs)
+            size = len(result)
+            return result
+        finally:
+            record(QUERY, query, start, size)
+
+    def iter_construct(self, query, default_graph=None):
+        start = perf_counter()
+        size = 0
+        complete = False
+        try:
+            for triple in super().iter_construct(query, default_graph):
+                size += 1
+                yield triple
+            complete = True
+        finally:
+            record(QUERY, query, start, size if complete else None)
+
+    def _update(self, update):
+        start = perf_counter()
+        try:
+            return super()._update(update)
+        finally:
+            record(UPDATE, update, start, None)
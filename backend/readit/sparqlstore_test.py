@@ -0,0 +1,96 @@
+from threading import Thread
+from time import perf_counter
+
+from rdflib import BNode, Graph, Literal, URIRef
+
+from .metrics import observe, observe_fulltext, render_metrics
+from .middleware import summarize
+from .sparqlstore import *
+
+
+def test_fingerprint():
+    one = fingerprint('SELECT ?s WHERE { ?s <http://a/1> "x" ; <http://b> 1 }')
+    two = fingerprint('''
+        SELECT ?s WHERE {
+            ?s <http://a/2> 'y \\'quoted\\'' ; <http://c> 22
+        }
+    ''')
+    other = fingerprint('SELECT ?o WHERE { <http://a/1> <http://b> ?o }')
+    assert one == two
+    assert one != other
+    assert fingerprint('SELECT ?s1 WHERE { ?s1 ?p ?o }') != fingerprint(
+        'SELECT ?s2 WHERE { ?s2 ?p ?o }'
+    )
+
+
+def test_recording():
+    start = perf_counter()
+    record(QUERY, 'ASK { <http://a> ?p ?o }', start, 1)
+    with recording() as outer:
+        record(QUERY, 'ASK { <http://a> ?p ?o }', start, 1)
+        with recording() as inner:
+            record(UPDATE, 'INSERT DATA { <http://a> <http://b> 1 }', start, None)
+        record(QUERY, 'ASK { <http://b> ?p ?o }', start, 1)
+    assert [trip.kind for trip in outer] == [QUERY, QUERY]
+    assert outer[0].fingerprint == outer[1].fingerprint
+    assert [trip.kind for trip in inner] == [UPDATE]
+    summary = summarize(outer + inner)
+    assert summary[0]['count'] == 2
+    assert summary[0]['size'] == 2
+    assert summary[1]['kind'] == UPDATE
+
+
+def test_render_metrics():
+    with recording() as round_trips:
+        record(QUERY, 'ASK { ?s ?p ?o }', perf_counter(), 1)
+    observe(round_trips, 'my-view')
+    text = render_metrics()
+    assert '# TYPE readit_sparql_round_trips_total counter' in text
+    assert 'readit_sparql_requests_total{view="my-view"} 1' in text
+    observe_fulltext(0.5, 3)
+    assert '# TYPE readit_fulltext_seconds_total counter' in render_metrics()
+
+
+def test_edits_per_thread():
+    store = PooledSPARQLUpdateStore(
+        query_endpoint='http://localhost/sparql',
+        update_endpoint='http://localhost/sparql',
+        autocommit=False,
+    )
+    store._transaction().append('INSERT DATA { <http://a> <http://b> 1 }')
+    seen = []
+    thread = Thread(target=lambda: seen.append(store._edits))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+    assert len(store._edits) == 1
+
+
+def test_query_form():
+    assert query_form('''
+        # comment
+        BASE <http://a/>
+        PREFIX ex: <http://example.com/>
+        PREFIX : <http://b/>
+        construct { ?s ?p ?o } WHERE { ?s ?p ?o }
+    ''') == 'CONSTRUCT'
+    assert query_form('ASK { ?s ?p ?o }') == 'ASK'
+    assert query_form('DESCRIBE <http://a>') == 'DESCRIBE'
+    assert query_form('SELECT * WHERE { ?s ?p ?o }') == 'SELECT'
+    assert query_form('INSERT DATA { <http://a> <http://b> 1 }') is None
+
+
+def test_iter_ntriples():
+    graph = Graph()
+    subject = BNode()
+    for number in range(100):
+        graph.add((subject, URIRef('http://a/{}'.format(number)), Literal(
+            'élément numéro {}'.format(number), lang='fr',
+        )))
+    data = graph.serialize(format='nt', encoding='utf-8')
+    chunks = (data[i:i + 7] for i in range(0, len(data), 7))
+    parsed = Graph()
+    parsed.addN((s, p, o, parsed) for (s, p, o) in iter_ntriples(chunks))
+    assert len(parsed) == 100
+    assert len(set(parsed.subjects())) == 1
+    assert Literal('élément numéro 42', lang='fr') in set(parsed.objects())
@@ -7,9 +7,13 @@ RDF_NAMESPACE_ROOT = 'http://{}/'.format(RDF_NAMESPACE_HOST)
 
 TRIPLESTORE_NAMESPACE = 'readit-test'
 TRIPLESTORE_SPARQL_ENDPOINT = f'{TRIPLESTORE_BASE_URL}/namespace/{TRIPLESTORE_NAMESPACE}/sparql'
-RDFLIB_STORE = SPARQLUpdateStore(
+RDFLIB_STORE = InstrumentedSPARQLUpdateStore(
     query_endpoint=TRIPLESTORE_SPARQL_ENDPOINT,
     update_endpoint=TRIPLESTORE_SPARQL_ENDPOINT,
+    pool_size=TRIPLESTORE_POOL_SIZE,
+    timeout=TRIPLESTORE_TIMEOUT,
+    retries=TRIPLESTORE_RETRIES,
+    backoff=TRIPLESTORE_BACKOFF,
 )
 
 INDEX_FILE_PATH = 'trivial.html'
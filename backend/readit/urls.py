@@ -28,6 +28,7 @@ from items import ITEMS_ROUTE
 from items.views import SemanticQueryViewSet
 from sparql_endpoints import SPARQL_ROUTE
 from .index import index, specRunner
+from .metrics import SPARQLMetricsView
 from .utils import decode_and_proxy
 from feedback.views import FeedbackViewSet
 
@@ -52,6 +53,7 @@ urlpatterns = [
     path(SOURCES_ROUTE, include('sources.urls')),
     path(ITEMS_ROUTE, include('items.urls')),
     path(SPARQL_ROUTE, include('sparql_endpoints.urls')),
+    path('metrics', SPARQLMetricsView.as_view()),
 ]
 
 
@@ -0,0 +1,64 @@
+"""
+Script for measuring the latency of full text highlighting.
+
+Runs the highlight search of SourceHighlights for a sample of sources
+and queries and prints the median and 95th percentile latency. Run it
+before and after moving the index to the mapping with term vectors (see
+the `reindex_sources` command), and compare the highlighters.
+
+Usage: open an interactive Python shell with Django's `shell`
+command. Then:
+
+>>> from scripts.benchmark_highlights import benchmark
+>>> benchmark(['liberty', 'reading aloud'])
+>>> benchmark(['liberty', 'reading aloud'], highlighter='fvh')
+
+Pass `sample` to change the number of sources per query and `repeat`
+to change the number of runs per source and query.
+"""
+
+if __name__ == '__main__':
+    import sys
+    print(__doc__)
+    sys.exit()
+
+from statistics import median, quantiles
+from time import perf_counter
+
+from django.conf import settings
+
+from readit.elasticsearch import get_elasticsearch_client, search_body
+from sources.views import highlight_body
+
+es = get_elasticsearch_client()
+
+
+def sample_serials(size):
+    """ Return the serials of `size` sources from the index. """
+    result = es.search(body=search_body(
+        {"exists": {"field": "id"}}, ['id'],
+    ), index=settings.ES_ALIASNAME, size=size)
+    return [hit['_source']['id'] for hit in result['hits']['hits']]
+
+
+def benchmark(queries, sample=20, repeat=3, highlighter=None):
+    serials = sample_serials(sample)
+    times = []
+    for query in queries:
+        for serial in serials:
+            body = highlight_body(
+                {"term": {"id": serial}}, query, 'text',
+                highlighter=highlighter,
+            )
+            for attempt in range(repeat):
+                start = perf_counter()
+                es.search(body=body, index=settings.ES_ALIASNAME)
+                times.append(perf_counter() - start)
+    if len(times) < 2:
+        print('Not enough sources in the index.')
+        return
+    print('{} highlight searches with the {} highlighter'.format(
+        len(times), highlighter or settings.ES_HIGHLIGHTER,
+    ))
+    print('    median {:>8.3f}s'.format(median(times)))
+    print('    p95    {:>8.3f}s'.format(quantiles(times, n=20)[-1]))
@@ -0,0 +1,98 @@
+"""
+Script for comparing SPARQL result formats on our own queries.
+
+The store asks the triplestore for SPARQL JSON (SELECT, ASK) and
+N-Triples (CONSTRUCT, DESCRIBE), see readit.sparqlstore. This script
+measures how long typical queries of the application take in those
+formats, compared to the SPARQL XML and RDF/XML that rdflib asks for by
+default. Run it against a triplestore with realistic data.
+
+Usage: open an interactive Python shell with Django's `shell`
+command. Then:
+
+>>> from scripts.benchmark_result_formats import benchmark
+>>> benchmark()
+
+Pass `repeat` to change the number of runs per query and format and
+`category` to select another category of annotations (the name of an
+ontology class). The script prints the median time to fetch and parse
+each query.
+"""
+
+if __name__ == '__main__':
+    import sys
+    print(__doc__)
+    sys.exit()
+
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+
+from rdflib import Graph, Literal, URIRef
+
+from rdf.ns import RDF, OA
+from readit.sparqlstore import PooledSPARQLUpdateStore
+from items.constants import ITEMS_NS
+from items.index import ANNOTATIONS_QUERY, INDEX_NS, values
+from items.models import SourceAnnotation
+from items.traversal import traversal_query
+from items.views import ANNO_NS, ANNO_OF_CATEGORY_QUERY, CATEGORY_PATTERN
+from ontology import namespace as ONTO
+
+SAMPLE_SIZE = 100  # annotations in the annotation query
+PAGE_SIZE = 1000  # resources or rows in the other queries
+
+
+def queries(category):
+    """ Return (name, query, namespaces) of the queries to compare. """
+    annotations = [
+        URIRef(row.annotation)
+        for row in SourceAnnotation.objects.all()[:SAMPLE_SIZE]
+    ]
+    selected = [
+        ('triples of the items graph', '''
+            SELECT ?s ?p ?o WHERE {{ ?s ?p ?o }} LIMIT {}
+        '''.format(PAGE_SIZE), {}),
+    ]
+    if annotations:
+        selected.append(('annotations with their parts',
+            ANNOTATIONS_QUERY.format(values('annotation', annotations)),
+            INDEX_NS,
+        ))
+    return selected + [
+        ('traversal from annotations', '{}LIMIT {}'.format(
+            traversal_query(RDF.type, OA.Annotation, 1, 0), PAGE_SIZE,
+        ), {}),
+        ('annotations of a category', ANNO_OF_CATEGORY_QUERY.format(
+            pattern=CATEGORY_PATTERN.format(
+                category=ONTO[category].n3(), creator='', prefix=ITEMS_NS,
+            ),
+            after=Literal(ITEMS_NS).n3(),
+            limit=PAGE_SIZE,
+        ), ANNO_NS),
+    ]
+
+
+def run(store, query, namespaces, repeat):
+    """ Return the median seconds of `repeat` runs and the result size. """
+    graph = Graph(store, ITEMS_NS)
+    times = []
+    for attempt in range(repeat):
+        start = perf_counter()
+        size = len(graph.query(query, initNs=namespaces))
+        times.append(perf_counter() - start)
+    return median(times), size
+
+
+def benchmark(repeat=5, category='reader'):
+    endpoint = settings.TRIPLESTORE_SPARQL_ENDPOINT
+    stores = (
+        ('default', PooledSPARQLUpdateStore(endpoint, negotiate=False)),
+        ('negotiated', PooledSPARQLUpdateStore(endpoint)),
+    )
+    for name, query, namespaces in queries(category):
+        print(name)
+        for label, store in stores:
+            seconds, size = run(store, query, namespaces, repeat)
+            print('    {:<12}{:>8.3f}s {:>8} results'.format(label, seconds, size))
@@ -17,7 +17,7 @@ if __name__ == '__main__':
     print(__doc__)
     sys.exit()
 
-from rdflib import URIRef, BNode, Graph
+from rdflib import BNode, Graph
 
 from rdflib_django.utils import get_named_graph
 
@@ -25,23 +25,34 @@ from rdf.ns import *
 from items.constants import ITEMS_HISTORY_NS
 from items.models import EditCounter
 
-counter = EditCounter.current
 
+def reserve_uris(g):
+    """
+    Reserve a URI for every blank node that `deanonymize` will replace.
 
-def next_uri():
-    global counter
-    counter.increment()
-    return URIRef(str(counter))
+    Returns an iterator over the URIs, which are allocated in one block.
+    """
+    number = 0
+    for snapshot in g.subjects(OA.motivatedBy, OA.editing):
+        for body in g.objects(snapshot, OA.hasBody):
+            number += isinstance(body, BNode)
+        for target in g.objects(snapshot, OA.hasTarget):
+            if isinstance(target, BNode):
+                number += 1 + sum(
+                    isinstance(o, BNode) for o in g.objects(target)
+                )
+    return iter(EditCounter.current.reserve(number))
 
 
 def deanonymize():
     g = get_named_graph(ITEMS_HISTORY_NS)
+    uris = reserve_uris(g)
     additions = Graph()
     removals = Graph()
     for snapshot in g.subjects(OA.motivatedBy, OA.editing):
         for body in g.objects(snapshot, OA.hasBody):
             if isinstance(body, BNode):
-                body_uri = next_uri()
+                body_uri = next(uris)
                 removals.add((snapshot, OA.hasBody, body))
                 additions.add((snapshot, OA.hasBody, body_uri))
                 for p, o in g.predicate_objects(body):
@@ -49,13 +60,13 @@ def deanonymize():
                     additions.add((body_uri, p, o))
         for target in g.objects(snapshot, OA.hasTarget):
             if isinstance(target, BNode):
-                target_uri = next_uri()
+                target_uri = next(uris)
                 removals.add((snapshot, OA.hasTarget, target))
                 additions.add((snapshot, OA.hasTarget, target_uri))
                 for p, o in g.predicate_objects(target):
                     removals.add((target, p, o))
                     if isinstance(o, BNode): # state
-                        state_uri = next_uri()
+                        state_uri = next(uris)
                         for ps, os in g.predicate_objects(o):
                             removals.add((o, ps, os))
                             additions.add((state_uri, ps, os))
@@ -1,6 +1,12 @@
 """
 Script for moving all source texts from file store to Elasticsearch.
 
+To convert sources that are stored as a single document into passages,
+enable `ES_PASSAGES` in the settings, add the passage mapping and run:
+>>> from scripts.sources_to_elasticsearch import passage_mapping, text_to_passages
+>>> passage_mapping()
+>>> text_to_passages()
+
 Usage: open an interactive Python shell with Django's `shell`
 command. When working on a server, pass the arguments `--settings
 settings --pythonpath {directory/of/settings/file}`.
@@ -22,7 +28,10 @@ environ.setdefault('DJANGO_SETTINGS_MODULE', 'readit.settings')
 from django.conf import settings
 from rdf.ns import SCHEMA, ISO6391
 
-from readit.elasticsearch import get_elasticsearch_client
+from elasticsearch.helpers import scan
+
+from readit.elasticsearch import get_elasticsearch_client, search_body
+from sources.fulltext import store_fulltext, index_mapping, PASSAGE_FIELDS
 from sources.graph import graph as sources_graph
 from sources.utils import get_media_filename, get_serial_from_subject
 
@@ -33,11 +42,10 @@ def text_to_index():
     subjects = set(sources_graph().subjects())
     for s in subjects:
         serial = get_serial_from_subject(s)
-        result = es.search(body={
-            "query" : {
-                "term" : { "id" : serial }
-            }
-        }, index=settings.ES_ALIASNAME)
+        result = es.search(
+            body=search_body({"term": {"id": serial}}),
+            index=settings.ES_ALIASNAME,
+        )
         if result['hits']['total']['value'] > 0:
             continue
         filename = join(settings.MEDIA_ROOT, get_media_filename(serial))
@@ -73,10 +81,10 @@ def title_author_to_index():
         author = sg.value(s, SCHEMA.author)
         title = sg.value(s, SCHEMA.name)
         serial = get_serial_from_subject(s)
-        document = es.search(body={
-            "query" : {
-                "term" : { "id" : serial }
-            }}, index=settings.ES_ALIASNAME)
+        document = es.search(
+            body=search_body({"term": {"id": serial}}),
+            index=settings.ES_ALIASNAME,
+        )
         if document['hits']['total']['value']==0:
             print("serial {} not found in the index".format(serial))
             continue
@@ -125,3 +133,42 @@ def remove_text_other():
     print(es.update_by_query(
         body=update_body_capitalized,
         index=settings.ES_ALIASNAME))
+
+
+def passage_mapping():
+    """
+    Add the passage fields of sources.fulltext.index_mapping to the index.
+
+    Only needed for an index that was not created with that mapping,
+    e.g. by the `reindex_sources` command.
+    """
+    properties = index_mapping()['properties']
+    es.indices.put_mapping(index=settings.ES_ALIASNAME, properties={
+        field: properties[field] for field in PASSAGE_FIELDS
+    })
+
+
+def text_to_passages():
+    """
+    Re-index all sources that have their text in a single document as
+    passages. Each old document is deleted after its replacement is
+    stored.
+    """
+    if not settings.ES_PASSAGES:
+        print('Enable ES_PASSAGES in the settings first.')
+        return
+    cnt = 0
+    query = {"query": {"bool": {"filter": [
+        {"exists": {"field": "id"}},
+        {"exists": {"field": "text"}}
+    ]}}}
+    for doc in scan(es, query=query, index=settings.ES_ALIASNAME):
+        source = doc['_source']
+        metadata = {
+            key: value for key, value in source.items()
+            if not key.startswith('text')
+        }
+        store_fulltext(source['text'], metadata)
+        es.delete(index=doc['_index'], id=doc['_id'])
+        cnt += 1
+    print('Done, converted {} sources.'.format(cnt))
@@ -25,7 +25,7 @@ from os import environ
 from django.conf import settings
 
 from items.graph import graph as item_graph
-from readit.elasticsearch import get_elasticsearch_client
+from readit.elasticsearch import get_elasticsearch_client, search_body
 from sparql.utils import xml_sanitize_triple, find_invalid_xml, invalid_xml_remove
 
 environ.setdefault('DJANGO_SETTINGS_MODULE', 'readit.settings')
@@ -62,11 +62,7 @@ def clean_dirty_sources(sanitize=False):
     """
     cnt = 0
     es = get_elasticsearch_client()
-    body = {
-        "query": {
-            "match_all": {}
-        }
-    }
+    body = search_body({"match_all": {}}, ['id', 'text'], with_text=True)
     results = es.search(body, index=settings.ES_ALIASNAME)
     for res in results['hits']['hits']:
         text = res['_source']['text']
@@ -5,3 +5,5 @@ SOURCES_SLUG = 'source'
 SOURCES_ROUTE = '{}/'.format(SOURCES_SLUG)
 SOURCES_NS = '{}{}'.format(settings.RDF_NAMESPACE_ROOT, SOURCES_ROUTE)
 
+# Cache namespace of the listing of all sources, see readit.cache
+SOURCES_LISTING_CACHE = 'sources-listing'
@@ -0,0 +1,453 @@
+"""
+Storage and retrieval of source full texts in Elasticsearch.
+
+A source text is stored in one of two layouts. In the original layout,
+the whole text is a field of the source document. When
+settings.ES_PASSAGES is enabled, new texts are instead split into
+passages of at most settings.ES_PASSAGE_SIZE characters, which are
+stored as child documents of a source document that only holds
+metadata. Each passage knows its offsets in the full text, both in
+characters and in UTF-8 bytes, so that a range of the text can be
+fetched without loading the rest. Both layouts may coexist in the same
+index.
+
+Full texts are exposed as reader objects rather than as plain strings,
+so that views can stream (parts of) a text in chunks. A reader has a
+`length` in characters and a `byte_length` in UTF-8 encoded bytes and
+offers `chars(start, stop)` and `bytes(start, stop)` generators, which
+yield consecutive pieces of the given half-open range.
+"""
+
+import logging
+import re
+import time
+
+from django.conf import settings
+from elasticsearch.helpers import bulk
+
+from readit.elasticsearch import get_elasticsearch_client, search_body
+from readit.metrics import observe_fulltext
+from .utils import optional_localized
+
+es = get_elasticsearch_client()
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2**16  # characters or bytes per streamed piece
+
+BYTES = 'bytes'
+CHARS = 'chars'
+RANGE_UNITS = (BYTES, CHARS)
+RANGE_PATTERN = re.compile(r'^\s*(\w+)\s*=\s*(\d*)\s*-\s*(\d*)\s*$')
+
+# Name of the join field that links passages to their source document
+RELATION_FIELD = 'source_relation'
+SOURCE_RELATION = 'source'
+PASSAGE_RELATION = 'passage'
+# Character and UTF-8 byte offsets of passages, and lengths of full texts
+OFFSET_FIELDS = ('start', 'end', 'byte_start', 'byte_end', 'length',
+                 'byte_length')
+# Fields that index_mapping adds for the passage layout
+PASSAGE_FIELDS = (RELATION_FIELD, 'source_id') + OFFSET_FIELDS
+PASSAGE_PAGE_SIZE = 100  # passages per search request when reading
+# Metadata of the source document that is needed to read its text
+READER_FIELDS = ['id', 'text', 'length', 'byte_length']
+# Full text fields keep their term vectors with offsets, so that the
+# highlighter does not need to analyse long texts again for every query.
+FULLTEXT_MAPPING = {'type': 'text', 'term_vector': 'with_positions_offsets'}
+LANGUAGE_ANALYZERS = {
+    'en': 'english',
+    'fr': 'french',
+    'de': 'german',
+    'nl': 'dutch',
+}
+INDEX_NAME_PATTERN = re.compile(r'^(.*)-(\d+)$')
+
+
+def index_mapping():
+    """
+    Return the mapping for a new index of sources.
+
+    The mapping covers both layouts, see the module docstring. The
+    README describes how to move an existing index to this mapping with
+    the `reindex_sources` command.
+    """
+    properties = {
+        'id': {'type': 'keyword'},
+        'language': {'type': 'keyword'},
+        'title': {'type': 'text'},
+        'author': {'type': 'text'},
+        'text': FULLTEXT_MAPPING,
+        RELATION_FIELD: {
+            'type': 'join',
+            'relations': {SOURCE_RELATION: PASSAGE_RELATION},
+        },
+        'source_id': {'type': 'keyword'},
+    }
+    for field in OFFSET_FIELDS:
+        properties[field] = {'type': 'integer'}
+    for language, analyzer in LANGUAGE_ANALYZERS.items():
+        properties['text_' + language] = dict(
+            FULLTEXT_MAPPING, analyzer=analyzer,
+        )
+    return {
+        # text_<language> fields of other languages
+        'dynamic_templates': [{'localized_text': {
+            'match': 'text_*',
+            'mapping': FULLTEXT_MAPPING,
+        }}],
+        'properties': properties,
+    }
+
+
+def next_index_name(alias, indices):
+    """
+    Return the name for the index that succeeds `indices` behind `alias`.
+
+    Indices are named after the alias with a version number, e.g.,
+    `readit-1`, `readit-2`.
+    """
+    versions = [0]
+    for index in indices:
+        match = INDEX_NAME_PATTERN.match(index)
+        if match and match.group(1) == alias:
+            versions.append(int(match.group(2)))
+    return '{}-{}'.format(alias, max(versions) + 1)
+
+
+def split_passages(text, size):
+    """
+    Yield `(start, stop)` character offsets that split `text` in passages.
+
+    Each passage is at most `size` characters long. If possible, passages
+    end right after whitespace in the second half of the passage, so
+    that words are not cut in two.
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        stop = min(start + size, length)
+        if stop < length:
+            cut = max(
+                text.rfind(' ', start + size // 2, stop),
+                text.rfind('\n', start + size // 2, stop),
+            )
+            if cut != -1:
+                stop = cut + 1
+        yield start, stop
+        start = stop
+
+
+def passage_actions(text, metadata, parent_id, index):
+    """
+    Generate bulk index actions for the passages of `text`.
+
+    Like source documents in the original layout, passages keep both
+    `text` and a `text_<language>` copy. The copy is indexed with the
+    analyzer of the language, which a single field cannot do for all
+    languages. Its `_source` cannot be dropped either: partial updates,
+    such as those of scripts/xml_sanitize.py, and the `reindex_sources`
+    command rebuild documents from `_source`, so the field would
+    silently disappear.
+    """
+    byte_start = 0
+    for start, stop in split_passages(text, settings.ES_PASSAGE_SIZE):
+        passage = text[start:stop]
+        byte_stop = byte_start + len(passage.encode('utf-8'))
+        yield {
+            '_index': index,
+            '_routing': parent_id,
+            '_source': optional_localized({
+                'source_id': metadata['id'],
+                'language': metadata['language'],
+                'start': start,
+                'end': stop,
+                'byte_start': byte_start,
+                'byte_end': byte_stop,
+                'text': passage,
+                RELATION_FIELD: {
+                    'name': PASSAGE_RELATION,
+                    'parent': parent_id,
+                },
+            }),
+        }
+        byte_start = byte_stop
+
+
+def store_fulltext(text, metadata, index=settings.ES_ALIASNAME):
+    """
+    Index `text` together with the source `metadata` in Elasticsearch.
+
+    `metadata` should at least contain the `id` and `language` of the
+    source. The layout depends on settings.ES_PASSAGES.
+    """
+    if not settings.ES_PASSAGES:
+        es.index(
+            index=index,
+            document=optional_localized(dict(metadata, text=text)),
+        )
+        return
+    parent = es.index(index=index, document=dict(
+        metadata,
+        length=len(text),
+        byte_length=len(text.encode('utf-8')),
+        **{RELATION_FIELD: SOURCE_RELATION},
+    ))
+    bulk(es, passage_actions(text, metadata, parent['_id'], index))
+
+
+def iter_passages(serials, start=0, stop=None, unit=CHARS,
+                  index=settings.ES_ALIASNAME):
+    """
+    Yield the passages of the sources in `serials` in text order.
+
+    Only passages that overlap with the half-open range `start`-`stop`
+    are included, where the offsets are in characters or bytes
+    depending on `unit`. Passages are fetched in pages, so memory use
+    does not depend on the length of the texts.
+    """
+    prefix = 'byte_' if unit == BYTES else ''
+    overlap = {prefix + 'end': {'gt': start}}
+    filters = [
+        {'terms': {'source_id': list(map(str, serials))}},
+        {'range': overlap},
+    ]
+    if stop is not None:
+        filters.append({'range': {prefix + 'start': {'lt': stop}}})
+    body = search_body(
+        {'bool': {'filter': filters}},
+        ['source_id', 'start', 'end', 'byte_start', 'text'],
+        with_text=True,
+        sort=[{'source_id': 'asc'}, {prefix + 'start': 'asc'}],
+    )
+    while True:
+        result = es.search(
+            body=body, index=index, size=PASSAGE_PAGE_SIZE,
+        )
+        hits = result['hits']['hits']
+        for hit in hits:
+            yield hit['_source']
+        if len(hits) < PASSAGE_PAGE_SIZE:
+            return
+        body['search_after'] = hits[-1]['sort']
+
+
+def fetch_sources(serials, index=settings.ES_ALIASNAME):
+    """ Return the reader metadata of the source documents of `serials`. """
+    result = es.search(body=search_body(
+        {"terms": {"id": serials}}, READER_FIELDS, with_text=True,
+    ), index=index, size=len(serials))
+    return [hit['_source'] for hit in result['hits']['hits']]
+
+
+def fetch_fulltext(serials, index=settings.ES_ALIASNAME):
+    """
+    Return a dict mapping each serial in `serials` to its full text.
+
+    All texts are retrieved with a single `terms` query, plus paged
+    queries for the passages of texts that are stored in passages.
+    Serials for which no document exists in the index are simply left
+    out.
+    """
+    serials = list(map(str, serials))
+    if not serials:
+        return {}
+    start = time.perf_counter()
+    texts = {}
+    chunked = []
+    for source in fetch_sources(serials, index):
+        serial = str(source['id'])
+        if 'text' in source:
+            texts[serial] = source['text']
+        else:
+            chunked.append(serial)
+            texts[serial] = ''
+    if chunked:
+        pieces = {serial: [] for serial in chunked}
+        for passage in iter_passages(chunked, index=index):
+            pieces[passage['source_id']].append(passage['text'])
+        texts.update((serial, ''.join(p)) for serial, p in pieces.items())
+    seconds = time.perf_counter() - start
+    observe_fulltext(seconds, len(texts))
+    logger.info('Fetched {} of {} full texts in {:.3f}s'.format(
+        len(texts), len(serials), seconds))
+    return texts
+
+
+def chunked(sequence, start, stop):
+    """ Yield `sequence[start:stop]` in pieces of at most CHUNK_SIZE. """
+    for offset in range(start, stop, CHUNK_SIZE):
+        yield sequence[offset:min(offset + CHUNK_SIZE, stop)]
+
+
+class StoredText:
+    """ Reader for a full text that is stored as a single document. """
+
+    def __init__(self, text):
+        self.text = text
+        self.length = len(text)
+        self._encoded = None
+
+    @property
+    def encoded(self):
+        if self._encoded is None:
+            self._encoded = self.text.encode('utf-8')
+        return self._encoded
+
+    @property
+    def byte_length(self):
+        return len(self.encoded)
+
+    def chars(self, start, stop):
+        return chunked(self.text, start, stop)
+
+    def bytes(self, start, stop):
+        return chunked(self.encoded, start, stop)
+
+
+class PassageText:
+    """ Reader for a full text that is stored in passages. """
+
+    def __init__(self, serial, length, byte_length, index):
+        self.serial = serial
+        self.length = length
+        self.byte_length = byte_length
+        self.index = index
+
+    def chars(self, start, stop):
+        for passage in iter_passages(
+            [self.serial], start, stop, CHARS, self.index,
+        ):
+            offset = passage['start']
+            text = passage['text']
+            yield text[max(start - offset, 0):stop - offset]
+
+    def bytes(self, start, stop):
+        for passage in iter_passages(
+            [self.serial], start, stop, BYTES, self.index,
+        ):
+            offset = passage['byte_start']
+            encoded = passage['text'].encode('utf-8')
+            yield encoded[max(start - offset, 0):stop - offset]
+
+
+def get_fulltext(serial, index=settings.ES_ALIASNAME):
+    """ Return a reader for the full text of `serial`, or None. """
+    sources = fetch_sources([str(serial)], index)
+    if not sources:
+        return None
+    source = sources[0]
+    if 'text' in source:
+        return StoredText(source['text'])
+    return PassageText(
+        str(serial), source['length'], source['byte_length'], index,
+    )
+
+
+def parse_range(header):
+    """
+    Parse the value of a Range header.
+
+    Returns a tuple `(unit, first, last)`, where `first` and `last` are
+    the ints from the header or None if omitted. Returns None if there
+    is no header, if the unit is not in RANGE_UNITS, if multiple ranges
+    are requested or if `last` is less than `first`; per RFC 7233, such
+    a header may be ignored and is invalid, respectively.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header)
+    if not match:
+        return None
+    unit, first, last = match.groups()
+    if unit not in RANGE_UNITS or not (first or last):
+        return None
+    first = int(first) if first else None
+    last = int(last) if last else None
+    if first is not None and last is not None and last < first:
+        return None
+    return unit, first, last
+
+
+def resolve_range(first, last, length):
+    """
+    Convert a parsed range to a half-open `(start, stop)` interval.
+
+    `last` is inclusive as in HTTP. A missing `first` means a suffix
+    range of `last` units. Raises ValueError if the range cannot be
+    satisfied for a resource of `length` units.
+    """
+    if first is None:
+        start, stop = max(length - last, 0), length
+    else:
+        start = first
+        stop = length if last is None else min(last + 1, length)
+    if start >= length or start >= stop:
+        raise ValueError('Range not satisfiable')
+    return start, stop
+
+
+def match_passages(clause):
+    """
+    Extend a query `clause` to also match sources on their passages.
+
+    The result matches source documents only, either directly or because
+    one of their passages matches `clause`.
+    """
+    sources_only = [{"exists": {"field": "id"}}]
+    if "match_all" in clause:
+        return {"bool": {"filter": sources_only}}
+    return {"bool": {
+        "should": [clause, {"has_child": {
+            "type": PASSAGE_RELATION,
+            "query": clause,
+            "score_mode": "max",
+        }}],
+        "minimum_should_match": 1,
+        "filter": sources_only,
+    }}
+
+
+def highlight_passages(clause, query, highlight):
+    """
+    Extend a query `clause` on a source document with passage highlights.
+
+    The source document still matches if none of its passages match
+    `query`. Highlights are requested with the settings in `highlight`.
+    """
+    return {"bool": {
+        "filter": [clause],
+        "should": [{"has_child": {
+            "type": PASSAGE_RELATION,
+            "query": {"simple_query_string": {
+                "query": query,
+                "fields": ["text*"],
+            }},
+            "score_mode": "max",
+            "inner_hits": {
+                "_source": False,
+                "size": highlight["number_of_fragments"],
+                "highlight": highlight,
+            },
+        }}],
+    }}
+
+
+def merge_passage_highlights(hit, limit):
+    """
+    Return the highlights of `hit`, including those of its passages.
+
+    At most `limit` fragments are kept per field.
+    """
+    highlights = {
+        field: list(fragments)
+        for field, fragments in hit.get('highlight', {}).items()
+    }
+    inner_hits = hit.get('inner_hits', {}).get(PASSAGE_RELATION)
+    if not inner_hits:
+        return highlights
+    for passage in inner_hits['hits']['hits']:
+        for field, fragments in passage.get('highlight', {}).items():
+            merged = highlights.setdefault(field, [])
+            merged.extend(fragments[:max(0, limit - len(merged))])
+    return highlights
@@ -0,0 +1,108 @@
+import pytest
+
+from .fulltext import *
+
+
+def test_fetch_fulltext(es_client, es_index_name):
+    for serial in (42, 43):
+        es_client.create(index=es_index_name, id=serial, document={
+            'id': serial,
+            'text': 'Text of source {}'.format(serial),
+        }, refresh=True)
+    texts = fetch_fulltext([42, 43, 44], index=es_index_name)
+    assert texts == {
+        '42': 'Text of source 42',
+        '43': 'Text of source 43',
+    }
+    assert fetch_fulltext([], index=es_index_name) == {}
+
+
+def test_stored_text():
+    text = StoredText('Ça va? ' * CHUNK_SIZE)
+    assert text.length == 7 * CHUNK_SIZE
+    assert text.byte_length == 8 * CHUNK_SIZE
+    chunks = list(text.chars(3, 2 * CHUNK_SIZE + 10))
+    assert len(chunks) == 3
+    assert ''.join(chunks) == text.text[3:2 * CHUNK_SIZE + 10]
+    assert b''.join(text.bytes(0, 3)) == 'Ça'.encode('utf-8')
+
+
+def test_parse_range():
+    assert parse_range(None) is None
+    assert parse_range('bytes=0-99') == ('bytes', 0, 99)
+    assert parse_range('chars=100-') == ('chars', 100, None)
+    assert parse_range('bytes=-500') == ('bytes', None, 500)
+    assert parse_range('lines=0-99') is None
+    assert parse_range('bytes=0-9, 20-29') is None
+    assert parse_range('bytes=-') is None
+    assert parse_range('bytes=5-3') is None
+
+
+def test_resolve_range():
+    assert resolve_range(0, 99, 1000) == (0, 100)
+    assert resolve_range(900, 1999, 1000) == (900, 1000)
+    assert resolve_range(100, None, 1000) == (100, 1000)
+    assert resolve_range(None, 500, 1000) == (500, 1000)
+    assert resolve_range(None, 5000, 1000) == (0, 1000)
+    with pytest.raises(ValueError):
+        resolve_range(1000, None, 1000)
+    with pytest.raises(ValueError):
+        resolve_range(None, 0, 1000)
+
+
+def test_split_passages():
+    text = 'The quick brown fox jumps over the lazy dog'
+    passages = list(split_passages(text, 10))
+    assert ''.join(text[start:stop] for start, stop in passages) == text
+    assert all(stop - start <= 10 for start, stop in passages)
+    assert text[slice(*passages[0])] == 'The quick '
+    unbroken = 'x' * 25
+    assert list(split_passages(unbroken, 10)) == [(0, 10), (10, 20), (20, 25)]
+    assert list(split_passages('', 10)) == []
+
+
+def test_merge_passage_highlights():
+    hit = {
+        'highlight': {'title': ['The <mark>answer</mark>']},
+        'inner_hits': {PASSAGE_RELATION: {'hits': {'hits': [
+            {'highlight': {'text': ['first <mark>answer</mark>']}},
+            {'highlight': {'text': [
+                'second <mark>answer</mark>',
+                'third <mark>answer</mark>',
+            ]}},
+        ]}}},
+    }
+    highlights = merge_passage_highlights(hit, 2)
+    assert highlights == {
+        'title': ['The <mark>answer</mark>'],
+        'text': ['first <mark>answer</mark>', 'second <mark>answer</mark>'],
+    }
+    # the parent may already have more fragments than the limit
+    hit['highlight']['text'] = ['a', 'b', 'c']
+    assert merge_passage_highlights(hit, 2)['text'] == ['a', 'b', 'c']
+
+
+def test_match_passages():
+    clause = {'simple_query_string': {'query': 'answer'}}
+    extended = match_passages(clause)['bool']
+    assert clause in extended['should']
+    assert extended['should'][1]['has_child']['query'] == clause
+    assert 'should' not in match_passages({'match_all': {}})['bool']
+
+
+def test_index_mapping():
+    mapping = index_mapping()
+    properties = mapping['properties']
+    assert properties['text']['term_vector'] == 'with_positions_offsets'
+    assert properties['text_en']['analyzer'] == 'english'
+    assert properties['text_en']['term_vector'] == 'with_positions_offsets'
+    assert properties[RELATION_FIELD]['type'] == 'join'
+    template, = mapping['dynamic_templates']
+    assert template['localized_text']['match'] == 'text_*'
+
+
+def test_next_index_name():
+    assert next_index_name('readit', []) == 'readit-1'
+    assert next_index_name('readit', ['readit-1']) == 'readit-2'
+    assert next_index_name('readit', ['readit-9', 'other-12']) == 'readit-10'
+    assert next_index_name('readit', ['readit']) == 'readit-1'
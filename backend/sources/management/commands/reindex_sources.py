@@ -0,0 +1,70 @@
+"""
+Move the Elasticsearch index of the sources to the current mapping.
+
+The mapping of an existing field cannot be changed in place, so the
+command creates a new index with the mapping of
+sources.fulltext.index_mapping, copies all documents into it and then
+points the alias in settings.ES_ALIASNAME to the new index. The old
+index is kept unless --delete-old is passed, so that the alias can be
+moved back if needed.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from elasticsearch import NotFoundError
+
+from readit.elasticsearch import get_elasticsearch_client
+from sources.fulltext import index_mapping, next_index_name
+
+REINDEX_TIMEOUT = 6 * 60 * 60  # seconds
+
+
+class Command(BaseCommand):
+    help = 'Reindex the sources into a new index with the current mapping.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--index',
+            help='Name of the new index (default: the alias with the next '
+                 'version number, e.g. readit-2).',
+        )
+        parser.add_argument(
+            '--delete-old', action='store_true',
+            help='Delete the old index after the alias has been moved.',
+        )
+
+    def handle(self, *args, index=None, delete_old=False, **options):
+        es = get_elasticsearch_client()
+        alias = settings.ES_ALIASNAME
+        try:
+            old = list(es.indices.get_alias(name=alias))
+        except NotFoundError:
+            old = []
+        new = index or next_index_name(alias, old)
+        es.indices.create(index=new, mappings=index_mapping())
+        self.stdout.write('Created index {}.'.format(new))
+        if old:
+            result = es.options(request_timeout=REINDEX_TIMEOUT).reindex(
+                source={'index': old},
+                dest={'index': new},
+                wait_for_completion=True,
+                refresh=True,
+            )
+            if result['failures']:
+                raise CommandError(
+                    'Reindexing failed, the alias still points to {}: '
+                    '{}'.format(', '.join(old), result['failures'][0])
+                )
+            self.stdout.write('Copied {} documents in {:.1f}s.'.format(
+                result['total'], result['took'] / 1000,
+            ))
+        es.indices.update_aliases(actions=[
+            {'remove': {'index': name, 'alias': alias}} for name in old
+        ] + [
+            {'add': {'index': new, 'alias': alias}},
+        ])
+        self.stdout.write('Alias {} now points to {}.'.format(alias, new))
+        if old and delete_old:
+            es.indices.delete(index=old)
+            self.stdout.write('Deleted {}.'.format(', '.join(old)))
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sources', '0004_alter_sourcescounter_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceIngestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serial', models.PositiveIntegerField(unique=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be processed'), ('sanitizing', 'Sanitizing the text'), ('indexing', 'Indexing the text'), ('annotating', 'Requesting automated annotations'), ('storing', 'Storing the metadata'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('creator', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0005_sourceingestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnotationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=64, unique=True)),
+                ('source', models.CharField(max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('next_poll', models.DateTimeField(db_index=True)),
+                ('deadline', models.DateTimeField()),
+            ],
+        ),
+    ]
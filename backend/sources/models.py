@@ -1,5 +1,62 @@
+from django.db import models
+from django.conf import settings
+
 from rdf.baseclasses import BaseCounter
 from .constants import SOURCES_NS
 
+
 class SourcesCounter(BaseCounter):
     namespace = SOURCES_NS
+
+
+class SourceIngestion(models.Model):
+    """ Progress of the asynchronous ingestion of an uploaded source. """
+    PENDING = 'pending'
+    SANITIZING = 'sanitizing'
+    INDEXING = 'indexing'
+    ANNOTATING = 'annotating'
+    STORING = 'storing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Waiting to be processed'),
+        (SANITIZING, 'Sanitizing the text'),
+        (INDEXING, 'Indexing the text'),
+        (ANNOTATING, 'Requesting automated annotations'),
+        (STORING, 'Storing the metadata'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    serial = models.PositiveIntegerField(unique=True)
+    filename = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING,
+    )
+    detail = models.TextField(blank=True)
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{} ({})'.format(self.serial, self.status)
+
+    def advance(self, status, detail=''):
+        """ Record that ingestion has reached `status`. """
+        self.status = status
+        self.detail = detail
+        self.save(update_fields=['status', 'detail', 'updated'])
+
+
+class AnnotationJob(models.Model):
+    """ A job at IRISA whose automated annotations were not imported yet. """
+    job_id = models.CharField(max_length=64, unique=True)
+    source = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+    next_poll = models.DateTimeField(db_index=True)
+    deadline = models.DateTimeField()
+
+    def __str__(self):
+        return '{} ({})'.format(self.job_id, self.source)
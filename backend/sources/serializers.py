@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+from .models import SourceIngestion
+
+
+class SourceIngestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SourceIngestion
+        fields = ['serial', 'status', 'detail', 'created', 'updated']
@@ -1,67 +1,246 @@
 import requests
-import time
+from requests.utils import quote
+from datetime import timedelta
+import html
 import logging
 
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
 
-from rdflib import Graph, BNode, URIRef
+from celery import chain
+from rdflib import Graph, BNode
 
 from readit import celery_app
+from readit.cache import bump_version
 from ontology.fixture import replace_prefix
+from rdf.ns import RDF, OA
+from items.constants import ITEMS_CACHE
 from items.graph import graph as item_graph
+from items.index import index_annotations
 from items.models import ItemCounter
 from nlp_ontology.constants import NLP_NS, INSTANCE_NLP_NS
+from sparql.utils import invalid_xml_remove
+from .constants import SOURCES_NS, SOURCES_LISTING_CACHE
+from .fulltext import store_fulltext
+from .graph import graph as sources_graph
+from .models import SourceIngestion, AnnotationJob
 
 logger = logging.getLogger(__name__)
 
 
+class IngestionTask(celery_app.Task):
+    """
+    Base class for the steps of source ingestion.
+
+    The first argument of each step is the serial of the source, which
+    is used to mark its SourceIngestion as failed if the step raises.
+    """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        SourceIngestion.objects.filter(serial=args[0]).update(
+            status=SourceIngestion.FAILED, detail=str(exc),
+        )
+        for ingestion in SourceIngestion.objects.filter(serial=args[0]):
+            discard_source_file(ingestion)
+
+
+def ingest_source(ingestion, metadata, triples):
+    """
+    Start the asynchronous ingestion of an uploaded source.
+
+    `ingestion` is the SourceIngestion of the upload, `metadata` the
+    fields that are indexed along with the text and `triples` the
+    metadata graph of the source, serialized as N-Triples.
+    """
+    serial = ingestion.serial
+    return chain(
+        sanitize_source.si(serial),
+        index_source.si(serial, metadata),
+        submit_automated_annotations.si(serial),
+        store_source_graph.si(serial, triples),
+    ).delay()
+
+
+def read_source_text(ingestion):
+    with default_storage.open(ingestion.filename) as source_file:
+        return source_file.read().decode('utf8')
+
+
+def discard_source_file(ingestion):
+    """
+    Delete the uploaded text of `ingestion` from storage.
+
+    Once ingestion has finished or failed, the text lives on in the
+    Elasticsearch index only.
+    """
+    if not ingestion.filename:
+        return
+    default_storage.delete(ingestion.filename)
+    ingestion.filename = ''
+    ingestion.save(update_fields=['filename'])
+
+
+@celery_app.task(base=IngestionTask)
+def sanitize_source(serial):
+    """ Sanitize the uploaded text and store it in place of the upload. """
+    ingestion = SourceIngestion.objects.get(serial=serial)
+    ingestion.advance(SourceIngestion.SANITIZING)
+    text = html.escape(invalid_xml_remove(read_source_text(ingestion)))
+    default_storage.delete(ingestion.filename)
+    ingestion.filename = default_storage.save(
+        ingestion.filename, ContentFile(text.encode('utf8')),
+    )
+    ingestion.save(update_fields=['filename'])
+
+
+@celery_app.task(base=IngestionTask)
+def index_source(serial, metadata):
+    """ Store the sanitized text in the Elasticsearch index. """
+    ingestion = SourceIngestion.objects.get(serial=serial)
+    ingestion.advance(SourceIngestion.INDEXING)
+    store_fulltext(read_source_text(ingestion), metadata)
+
+
+@celery_app.task(base=IngestionTask)
+def submit_automated_annotations(serial):
+    """
+    Request automated annotations for the source from IRISA.
+
+    Failure to submit the job is logged, but does not stop ingestion.
+    """
+    ingestion = SourceIngestion.objects.get(serial=serial)
+    ingestion.advance(SourceIngestion.ANNOTATING)
+    text = read_source_text(ingestion)
+    uri = '{}{}'.format(SOURCES_NS, serial)
+    headers = {'Authorization': 'Token token={}'.format(
+        settings.IRISA_TOKEN)}
+    queue = "standard" if len(text) < 50000 else "batch"
+    job_parameters = ("--has-source {}".format(quote(uri, '')))
+    files = {
+        'job[webapp_id]': (None, '1042'),
+        'job[queue]': (None, queue),
+        'files[0]': ('file', text.encode('utf-8')),
+        'job[param]': (None, job_parameters)
+    }
+    try:
+        response = requests.post(
+            '{}/jobs'.format(settings.IRISA_URL), headers=headers,
+            files=files, timeout=settings.IRISA_REQUEST_TIMEOUT,
+        )
+    except requests.RequestException as error:
+        logger.warning('Failed to submit source {} to IRISA: {}'.format(
+            uri, error))
+        return
+    if response:
+        job_id = response.json().get('id')
+        # set the time for the query timeout:
+        # 20 minutes for small texts, 24 hours for large texts
+        timeout = 1200 if queue == 'standard' else 86400
+        schedule_annotation_job(job_id, uri, timeout)
+    else:
+        logger.warning(
+            "Failed to send request for automated annotations for source {}".format(uri))
+
+
+@celery_app.task(base=IngestionTask)
+def store_source_graph(serial, triples):
+    """ Add the metadata of the source to the triplestore. """
+    ingestion = SourceIngestion.objects.get(serial=serial)
+    ingestion.advance(SourceIngestion.STORING)
+    result = Graph()
+    result.parse(data=triples, format='nt')
+    full_graph = sources_graph()
+    # below stores result automagically
+    full_graph += result
+    bump_version(SOURCES_LISTING_CACHE)
+    ingestion.advance(SourceIngestion.DONE)
+    discard_source_file(ingestion)
+
+
 @celery_app.task
-def poll_automated_annotations(job_id, timeout):
+def poll_automated_annotations():
+    """
+    Check all IRISA jobs that are due in a single pass.
+
+    This task is scheduled periodically by celery beat. Jobs are tracked
+    in the database, so a pending job occupies no worker in between
+    polls and survives restarts. A job is polled every
+    settings.IRISA_WAIT seconds until its results are imported or its
+    deadline has passed.
+    """
+    now = timezone.now()
+    for job in AnnotationJob.objects.filter(next_poll__lte=now):
+        if job.deadline <= now:
+            logger.warning(
+                'No automated annotations for source {} before the deadline'.format(job.source))
+            job.delete()
+            continue
+        # claim the job, so that an overlapping pass will skip it
+        claimed = AnnotationJob.objects.filter(
+            pk=job.pk, next_poll=job.next_poll,
+        ).update(next_poll=now + timedelta(seconds=settings.IRISA_WAIT))
+        if claimed and poll_job(job):
+            job.delete()
+
+
+def schedule_annotation_job(job_id, source, timeout):
+    """ Start polling IRISA for the results of a job for `source`. """
+    now = timezone.now()
+    return AnnotationJob.objects.create(
+        job_id=job_id,
+        source=source,
+        next_poll=now + timedelta(seconds=settings.IRISA_FIRST_WAIT),
+        deadline=now + timedelta(seconds=timeout),
+    )
+
+
+def poll_job(job):
+    """ Import the results of `job` if available, return whether it did. """
     url = '{}/datastore/{}/automated_annotation_result'.format(
-        settings.IRISA_URL, job_id)
+        settings.IRISA_URL, job.job_id)
     headers = {
         'Accept': 'application/json',
         'Authorization': 'Token token={}'.format(settings.IRISA_TOKEN)
     }
-    time.sleep(10)  # wait for ten seconds to make sure url exists
-    waited = 10  # keep track of time waited in total
-    while waited < timeout:
-        result = requests.get(url, headers=headers)
-        if result and result.text:
-            g = Graph()
-            g.parse(data=result.text, format='turtle')
-            g = replace_bnodes(g)
-            if NLP_NS != INSTANCE_NLP_NS:
-                g = replace_prefix(g, NLP_NS, INSTANCE_NLP_NS)
-            logger.info('Retrieved {} items from allgo18 server'.format(
-                len(list(g.subjects()))))
-            graph = item_graph()
-            graph += g
-            break
-        else:
-            waited += settings.IRISA_WAIT
-            time.sleep(settings.IRISA_WAIT)
+    try:
+        result = requests.get(
+            url, headers=headers, timeout=settings.IRISA_REQUEST_TIMEOUT,
+        )
+    except requests.RequestException as error:
+        logger.warning('Failed to poll IRISA job {}: {}'.format(
+            job.job_id, error))
+        return False
+    if not (result and result.text):
+        return False
+    g = Graph()
+    g.parse(data=result.text, format='turtle')
+    g = replace_bnodes(g)
+    if NLP_NS != INSTANCE_NLP_NS:
+        g = replace_prefix(g, NLP_NS, INSTANCE_NLP_NS)
+    logger.info('Retrieved {} items from allgo18 server'.format(
+        len(list(g.subjects()))))
+    graph = item_graph()
+    graph += g
+    index_annotations(g.subjects(RDF.type, OA.Annotation))
+    bump_version(ITEMS_CACHE)
+    return True
 
 
 def replace_bnodes(graph):
-    bnodes = {}
+    """
+    Return a copy of `graph` in which blank nodes are replaced by items.
+
+    The item URIs for all blank nodes are reserved at once.
+    """
+    bnodes = {
+        node for s, p, o in graph for node in (s, o)
+        if isinstance(node, BNode)
+    }
+    uris = dict(zip(bnodes, ItemCounter.current.reserve(len(bnodes))))
     output_graph = Graph()
-    for s, p, o in graph:
-        new_subject = None
-        new_object = None
-        if isinstance(s, BNode):
-            if not s in bnodes.keys():
-                bnodes[s] = generate_uri()
-            new_subject = bnodes[s]
-        if isinstance(o, BNode):
-            if not o in bnodes.keys():
-                bnodes[o] = generate_uri()
-            new_object = bnodes[o]
-        output_graph.add((new_subject or s, p, new_object or o))
+    output_graph += (
+        (uris.get(s, s), p, uris.get(o, o)) for s, p, o in graph
+    )
     return output_graph
-
-
-def generate_uri():
-    counter = ItemCounter.current
-    counter.increment()
-    return URIRef(str(counter))
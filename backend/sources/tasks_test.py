@@ -1,9 +1,16 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
 from rdflib import Graph, URIRef
 
 from rdf.ns import *
 
 from .constants import *
-from .tasks import replace_bnodes
+from .models import SourceIngestion, AnnotationJob
+from .tasks import (replace_bnodes, sanitize_source, read_source_text,
+                    discard_source_file, schedule_annotation_job,
+                    poll_automated_annotations)
 from ontology.fixture import replace_prefix
 
 test_output = '@prefix ns1: <http://www.w3.org/ns/oa#> .\n@prefix ns2: <http://www.w3.org/ns/activitystreams#> .\n@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n\n[] a ns1:Annotation ;\n    ns2:generator <https://allgo18.inria.fr/apps/read_it_test> ;\n    ns1:hasBody <https://read-it.hum.uu.nl/nlp-ontology#person> ;\n    ns1:hasTarget [ a ns1:SpecificResource ;\n            ns1:hasSelector [ a ns1:TextPositionSelector ;\n                    ns1:end 233 ;\n                    ns1:start 220 ],\n                [ a ns1:TextQuoteSelector ;\n                    ns1:exact "Bilbo Baggins" ;\n                    ns1:prefix "everyday deeds of ordinary folk that keep the darkness at bay. Small acts of kindness and love. Why " ;\n                    ns1:suffix "? Perhaps because I am afraid, and he gives me courage." ] ;\n            ns1:hasSource <readit-test.url/source/42> ] .\n\n[] a ns1:Annotation ;\n    ns2:generator <https://allgo18.inria.fr/apps/read_it_test> ;\n    ns1:hasBody <https://read-it.hum.uu.nl/nlp-ontology#person> ;\n    ns1:hasTarget [ a ns1:SpecificResource ;\n            ns1:hasSelector [ a ns1:TextQuoteSelector ;\n                    ns1:exact "Saruman" ;\n                    ns1:prefix "" ;\n                    ns1:suffix " believes it is only great power that can hold evil in check, but that is not what I have found. It " ],\n                [ a ns1:TextPositionSelector ;\n                    ns1:end 7 ;\n                    ns1:start 0 ] ;\n            ns1:hasSource <readit-test.url/source/42> ] .\n\n\n'
@@ -25,3 +32,50 @@ def test_replace_namespace(sourcegraphdb):
     new_graph = replace_prefix(g, nlp_reference, TEST_NS)
     assert not new_graph.value(
         predicate=OA.hasBody, object=URIRef(nlp_reference))
+
+
+def test_sanitize_source(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    filename = default_storage.save(
+        'sources/00000001.txt', ContentFile('<b>\x0b1 & 2</b>'.encode('utf8')),
+    )
+    SourceIngestion.objects.create(serial=1, filename=filename)
+    sanitize_source(1)
+    ingestion = SourceIngestion.objects.get(serial=1)
+    assert ingestion.status == SourceIngestion.SANITIZING
+    assert read_source_text(ingestion) == '&lt;b&gt; 1 &amp; 2&lt;/b&gt;'
+
+
+def test_failed_ingestion(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    filename = default_storage.save(
+        'sources/00000002.txt', ContentFile(b'text'),
+    )
+    SourceIngestion.objects.create(serial=2, filename=filename)
+    sanitize_source.on_failure(OSError('failed'), 'task', (2,), {}, None)
+    ingestion = SourceIngestion.objects.get(serial=2)
+    assert ingestion.status == SourceIngestion.FAILED
+    assert ingestion.detail == 'failed'
+    assert not default_storage.exists(filename)
+
+
+def test_discard_source_file(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    filename = default_storage.save(
+        'sources/00000003.txt', ContentFile(b'text'),
+    )
+    ingestion = SourceIngestion.objects.create(serial=3, filename=filename)
+    discard_source_file(ingestion)
+    assert not default_storage.exists(filename)
+    assert SourceIngestion.objects.get(serial=3).filename == ''
+    discard_source_file(ingestion)
+
+
+def test_poll_expired_job(db):
+    now = timezone.now()
+    AnnotationJob.objects.create(
+        job_id='expired', source='source/1', next_poll=now, deadline=now,
+    )
+    later = schedule_annotation_job('later', 'source/2', 1200)
+    poll_automated_annotations()
+    assert list(AnnotationJob.objects.all()) == [later]
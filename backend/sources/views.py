@@ -1,13 +1,13 @@
+import json
 import logging
 import os
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, timezone
-import html
+from decimal import Decimal
 import functools
 import operator
-import requests
-from requests.utils import quote
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, Http404
 from django.core.files.storage import default_storage
 from django.conf import settings
 from django.contrib.admin.utils import flatten
@@ -18,6 +18,9 @@ from rest_framework.status import *
 from rest_framework.parsers import MultiPartParser
 from rest_framework.exceptions import ValidationError, NotFound
 from rest_framework.reverse import reverse
+from rest_framework.generics import RetrieveAPIView
+
+from elasticsearch import BadRequestError, NotFoundError
 
 from rdflib import BNode, Graph, URIRef, Literal
 from rdflib.plugins.sparql import prepareQuery
@@ -26,18 +29,23 @@ from rdf.ns import *
 from rdf.views import RDFView, RDFResourceView
 from rdf.utils import graph_from_triples, prune_triples_cascade, get_conjunctive_graph, sample_graph
 from vocab import namespace as vocab
-from readit.elasticsearch import get_elasticsearch_client
+from readit.cache import VersionedCacheMixin, bump_version
+from readit.elasticsearch import get_elasticsearch_client, search_body
 from staff.utils import submission_info
-from items.constants import ITEMS_NS
+from items.constants import ITEMS_NS, ITEMS_CACHE
 from items.graph import graph as items_graph
-from sparql.utils import invalid_xml_remove
+from items.models import SourceAnnotation, IndexedSource
 from . import namespace as ns
-from .constants import SOURCES_NS
+from .constants import SOURCES_NS, SOURCES_LISTING_CACHE
+from .fulltext import (BYTES, fetch_fulltext, get_fulltext, parse_range,
+                       resolve_range, match_passages,
+                       highlight_passages, merge_passage_highlights)
 from .graph import graph as sources_graph
-from .utils import get_media_filename, get_serial_from_subject, optional_localized
-from .models import SourcesCounter
+from .utils import get_media_filename, get_serial_from_subject
+from .models import SourcesCounter, SourceIngestion
 from .permissions import UploadSourcePermission, DeleteSourcePermission
-from .tasks import poll_automated_annotations
+from .serializers import SourceIngestionSerializer
+from .tasks import ingest_source
 
 es = get_elasticsearch_client()
 
@@ -68,6 +76,28 @@ SELECT_SOURCES_QUERY_END = '''
 PREFIXES = {
     'oa': OA,
 }
+FULLTEXT_CONTENT_TYPE = 'text/plain; charset=utf-8'
+# Metadata in the Elasticsearch documents that search results are made of
+SEARCH_FIELDS = ['id', 'title', 'author', 'language']
+KNOWN_LANGUAGES = {
+    'en': ISO6391.en,
+    'de': ISO6391.de,
+    'nl': ISO6391.nl,
+    'fr': ISO6391.fr,
+    'it': ISO6391.it,
+    'cs': ISO6391.cs
+}
+# Search results are paged with search_after within a point in time, so
+# that every page costs the same. The sort ends in a unique tiebreaker.
+SEARCH_KEEP_ALIVE = '2m'
+SEARCH_SORT = [{'_score': 'desc'}, {'_shard_doc': 'asc'}]
+# Elasticsearch's default index.max_result_window, which bounds `page`
+SEARCH_MAX_WINDOW = 10000
+INVALID_CURSOR_400 = 'Invalid or expired cursor, please restart the search.'
+INVALID_PAGE_400 = 'page must be a positive integer.'
+DEEP_PAGE_400 = 'page is too deep, please follow the next links instead.'
+HIGHLIGHT_FRAGMENTS = 3
+MAX_HIGHLIGHT_SOURCES = 100  # sources per request to SourceHighlightsBatch
 SOURCE_EXISTS_QUERY = 'ASK { ?source ?a ?b }'
 SOURCE_DELETE_QUERY = '''
 DELETE {{
@@ -103,21 +133,19 @@ def inject_fulltext(input, inline, request):
 
     If `inline` is true, add a `SCHEMA.text` property with the text verbatim.
     Otherwise, add a `vocab.fullText` property with a URI that dereferences to
-    the text.
+    the text. In the inline case, sources that lack an indexed text are
+    left without `SCHEMA.text`.
     """
     subjects = set(input.subjects())
+    serials = {s: get_serial_from_subject(s) for s in subjects}
     text_triples = Graph()
-    for s in subjects:
-        serial = get_serial_from_subject(s)
-        if inline:
-            result = es.search(body={
-                "query": {
-                    "term": {"id": serial}
-                }
-            }, index=settings.ES_ALIASNAME)
-            f = result['hits']['hits'][0]['_source']['text']
-            text_triples.add((s, SCHEMA.text, Literal(f)))
-        else:
+    if inline:
+        texts = fetch_fulltext(serials.values())
+        for s, serial in serials.items():
+            if serial in texts:
+                text_triples.add((s, SCHEMA.text, Literal(texts[serial])))
+    else:
+        for s, serial in serials.items():
             text_triples.add((s, vocab.fullText, URIRef(reverse(
                 'sources:fulltext',
                 kwargs={'serial': serial},
@@ -126,8 +154,13 @@ def inject_fulltext(input, inline, request):
     return input + text_triples
 
 
-class SourcesAPIRoot(RDFView):
-    """ For now, simply lists all sources. """
+class SourcesAPIRoot(VersionedCacheMixin, RDFView):
+    """
+    For now, simply lists all sources.
+
+    The rendered listing is cached until a source is added or deleted.
+    """
+    cache_namespace = SOURCES_LISTING_CACHE
 
     def graph(self):
         return sources_graph()
@@ -137,22 +170,74 @@ class SourcesAPIRoot(RDFView):
 
 
 class SourceSelection(RDFView):
-    ''' list all sources related to a search query. '''
+    '''
+    list all sources related to a search query.
+
+    Hits, total and metadata come from a single Elasticsearch request.
+    The total number of results is in the X-Total-Count header and the
+    page size in the X-Results-Per-Page header.
+
+    Every search runs within a point in time in Elasticsearch, sorted
+    with a unique tiebreaker. The first request may jump to a `page`
+    within SEARCH_MAX_WINDOW results. If more results follow, a Link
+    header with rel="next" points to the next page, which continues
+    after the last hit from an opaque `cursor` within the same point in
+    time. Following these links costs the same for every page and never
+    skips or repeats a source. The point in time is closed when the last
+    page has been fetched; an abandoned one expires after
+    SEARCH_KEEP_ALIVE.
+    '''
 
-    def get_graph(self, request, **kwargs):
-        body = construct_es_body(request)
-        from_value = 0
-        page = request.GET.get('page')
-        if page:
-            from_value = (int(page)-1) * settings.RESULTS_PER_PAGE
-        results = es.search(body=body, index=settings.ES_ALIASNAME,
-                            size=settings.RESULTS_PER_PAGE, from_=from_value)
-        if results['hits']['total']['value'] == 0:
-            return Graph()
-        selected_sources = select_sources_elasticsearch(results)
+    def get(self, request, format=None, **kwargs):
+        body = construct_es_body(request, SEARCH_FIELDS)
+        body['sort'] = SEARCH_SORT
+        cursor = request.GET.get('cursor')
+        if cursor:
+            pit_id, body['search_after'] = decode_cursor(cursor)
+            # the total is only reported with the first page
+            body['track_total_hits'] = False
+            from_value = 0
+        else:
+            page = parse_page(request.GET.get('page'))
+            from_value = (page - 1) * settings.RESULTS_PER_PAGE
+            if from_value + settings.RESULTS_PER_PAGE > SEARCH_MAX_WINDOW:
+                raise ValidationError(DEEP_PAGE_400)
+            pit_id = es.open_point_in_time(
+                index=settings.ES_ALIASNAME, keep_alive=SEARCH_KEEP_ALIVE,
+            )['id']
+        body['pit'] = {'id': pit_id, 'keep_alive': SEARCH_KEEP_ALIVE}
+        try:
+            # a search within a point in time must not name an index
+            results = es.search(body=body, size=settings.RESULTS_PER_PAGE,
+                                from_=from_value)
+        except (NotFoundError, BadRequestError):
+            if not cursor:
+                es.close_point_in_time(id=pit_id)
+                raise
+            raise ValidationError(INVALID_CURSOR_400)
+        hits = results['hits']['hits']
         selected_sources_graph = inject_fulltext(
-            graph_from_triples(list(selected_sources)), False, request)
-        return selected_sources_graph
+            search_results_graph(hits), False, request)
+        response = Response(selected_sources_graph)
+        total = results['hits'].get('total')
+        if total:
+            response['X-Total-Count'] = total['value']
+        response['X-Results-Per-Page'] = settings.RESULTS_PER_PAGE
+        last = total and total['relation'] == 'eq' and (
+            from_value + len(hits) >= total['value']
+        )
+        more = len(hits) == settings.RESULTS_PER_PAGE and not last
+        if not more:
+            es.close_point_in_time(id=results['pit_id'])
+            return response
+        params = request.GET.copy()
+        params.pop('page', None)
+        params['cursor'] = encode_cursor(results['pit_id'], hits[-1]['sort'])
+        next_page = '{}?{}'.format(
+            request.build_absolute_uri(request.path), params.urlencode(),
+        )
+        response['Link'] = '<{}>; rel="next"'.format(next_page)
+        return response
 
 
 class SourceHighlights(RDFView):
@@ -173,71 +258,139 @@ class SourceHighlights(RDFView):
         body = self.construct_es_body(serial, query, fields)
         results = es.search(body=body, index=settings.ES_ALIASNAME)
         try:
-            highlights = results['hits']['hits'][0]['highlight']
-        except KeyError:
+            hit = results['hits']['hits'][0]
+        except IndexError:
+            return Graph()
+        highlights = merge_passage_highlights(
+            hit, HIGHLIGHT_FRAGMENTS,
+        )
+        if not highlights:
             return Graph()
         highlight_graph = self.construct_highlight_graph(highlights)
         return highlight_graph
 
     def construct_es_body(self, serial, query, fields):
-        if fields == 'all':
-            fields_query = {
-                "text*": {},
-                "author": {},
-                "title": {}
-            }
-        elif fields == 'author':
-            fields_query = {
-                "author": {}
-            }
-        elif fields == 'title':
-            fields_query = {
-                "title": {}
-            }
-        else:
-            fields_query = {
-                "text*": {}
-            }
-        body = {
-            "query": {
-                "term": {"id": serial}
-            },
-            "highlight": {
-                "highlight_query": {
-                    "simple_query_string": {
-                        "query": query
-                    }
-                },
-                "fields": fields_query,
-                "fragment_size": 50,
-                "number_of_fragments": 3,
-                "pre_tags": ["<mark>"],
-                "post_tags": ["</mark>"]
-            }
-        }
-        return body
+        return highlight_body({"term": {"id": serial}}, query, fields)
 
     def construct_highlight_graph(self, highlights):
-        hg = Graph()
-        for key in highlights.keys():
-            if key == 'author':
-                obj = SCHEMA.author
-            elif key == 'title':
-                obj = DCTERMS.title
-            else:
-                obj = SCHEMA.text
-            subj = BNode()
-            hg.add((subj, RDF.type, OA.Annotation))
-            hg.add((subj, OA.hasTarget, obj))
-            for highlight in highlights.get(key):
-                if obj == SCHEMA.text:
-                    # add ellipses to start or end of string
-                    if not highlight[0].isupper():
-                        highlight = '(...) {}'.format(highlight)
-                    if not highlight[-1] in ['?', '.', '!']:
-                        highlight = '{} (...)'.format(highlight)
-                hg.add((subj, OA.hasBody, Literal(highlight)))
-        return hg
+        return highlight_graph(highlights)
+
+
+class SourceHighlightsBatch(RDFView):
+    '''
+    Highlight a query in several sources at once, with Elasticsearch.
+
+    Takes the same `query` and `fields` as SourceHighlights and a `source`
+    for each source, at most MAX_HIGHLIGHT_SOURCES. All sources are
+    highlighted with a single search. The highlights are linked to their
+    source with `schema:about`.
+    '''
+
+    def get_graph(self, request, **kwargs):
+        query = request.GET.get('query')
+        if query == '':
+            query = '*'
+        fields = request.GET.get('fields')
+        sources = request.GET.getlist('source')
+        if not query or not sources:
+            raise NotFound
+        if len(sources) > MAX_HIGHLIGHT_SOURCES:
+            raise ValidationError(
+                'At most {} sources can be highlighted at once.'.format(
+                    MAX_HIGHLIGHT_SOURCES
+                )
+            )
+        serials = list(set(map(get_serial_from_subject, sources)))
+        body = highlight_body(
+            {"terms": {"id": serials}}, query, fields, ['id'],
+        )
+        results = es.search(
+            body=body, index=settings.ES_ALIASNAME, size=len(serials),
+        )
+        result = Graph()
+        for hit in results['hits']['hits']:
+            highlights = merge_passage_highlights(hit, HIGHLIGHT_FRAGMENTS)
+            source = ns[str(hit['_source']['id'])]
+            result += highlight_graph(highlights, source)
+        return result
+
+
+def highlight_body(clause, query, fields, includes=(), highlighter=None):
+    '''
+    Build a search for the sources that match `clause`, highlighting `query`.
+
+    `fields` selects the fields to highlight: 'all', 'author', 'title' or
+    the full text otherwise. Hits only carry the fields in `includes`.
+    The full text is highlighted with `highlighter`, by default
+    settings.ES_HIGHLIGHTER.
+    '''
+    text_options = {"type": highlighter or settings.ES_HIGHLIGHTER}
+    if fields == 'all':
+        fields_query = {
+            "text*": text_options,
+            "author": {},
+            "title": {}
+        }
+    elif fields == 'author':
+        fields_query = {
+            "author": {}
+        }
+    elif fields == 'title':
+        fields_query = {
+            "title": {}
+        }
+    else:
+        fields_query = {
+            "text*": text_options
+        }
+    highlight = {
+        "highlight_query": {
+            "simple_query_string": {
+                "query": query
+            }
+        },
+        "fields": fields_query,
+        "fragment_size": 50,
+        "number_of_fragments": HIGHLIGHT_FRAGMENTS,
+        "pre_tags": ["<mark>"],
+        "post_tags": ["</mark>"]
+    }
+    body = search_body(clause, includes, highlight=highlight)
+    if settings.ES_PASSAGES and "text*" in fields_query:
+        body["query"] = highlight_passages(
+            body["query"], query, dict(highlight, fields={"text*": text_options}),
+        )
+    return body
+
+
+def highlight_graph(highlights, source=None):
+    '''
+    Return a graph with an annotation for each highlighted field.
+
+    If `source` is given, the annotations are linked to it.
+    '''
+    hg = Graph()
+    for key in highlights.keys():
+        if key == 'author':
+            obj = SCHEMA.author
+        elif key == 'title':
+            obj = DCTERMS.title
+        else:
+            obj = SCHEMA.text
+        subj = BNode()
+        hg.add((subj, RDF.type, OA.Annotation))
+        hg.add((subj, OA.hasTarget, obj))
+        if source is not None:
+            hg.add((subj, SCHEMA.about, source))
+        for highlight in highlights.get(key):
+            if obj == SCHEMA.text:
+                # add ellipses to start or end of string
+                if not highlight[0].isupper():
+                    highlight = '(...) {}'.format(highlight)
+                if not highlight[-1] in ['?', '.', '!']:
+                    highlight = '{} (...)'.format(highlight)
+            hg.add((subj, OA.hasBody, Literal(highlight)))
+    return hg
 
 
 class SourcesAPISingular(RDFResourceView):
@@ -259,37 +412,108 @@ class SourcesAPISingular(RDFResourceView):
         conjunctive.update(
             SOURCE_DELETE_QUERY, initNs=PREFIXES, initBindings=bindings
         )
+        SourceAnnotation.objects.filter(source=source_uri).delete()
+        IndexedSource.objects.filter(source=source_uri).delete()
+        bump_version(ITEMS_CACHE)
         serial = get_serial_from_subject(source_uri)
         es.delete_by_query(
             index=settings.ES_ALIASNAME,
-            body={"query": {
-                "match": {
-                    "id": serial
-                }
-            }}
+            body={"query": {"bool": {"should": [
+                {"match": {"id": serial}},
+                {"match": {"source_id": serial}},
+            ]}}}
         )
+        bump_version(SOURCES_LISTING_CACHE)
         return Response(Graph(), HTTP_204_NO_CONTENT)
 
 
 def source_fulltext(request, serial, query=None):
-    """ API endpoint for fetching the full text of a single source. """
-    body = {
-        "query": {
-            "term": {"id": serial}
-        }
-    }
-    result = es.search(body=body, index=settings.ES_ALIASNAME)
-    if result:
-        f = result['hits']['hits'][0]['_source']['text']
-        return HttpResponse(f, content_type='text/plain; charset=utf-8')
+    """
+    API endpoint for fetching the full text of a single source.
+
+    The text is streamed in chunks. A single range may be requested with
+    a Range header, either in `bytes` of the UTF-8 encoded text or in
+    `chars`, i.e., the character offsets that selectors also use.
+    """
+    text = get_fulltext(serial)
+    if text is None:
+        raise Http404
+    requested = parse_range(request.headers.get('Range'))
+    if requested is None:
+        response = StreamingHttpResponse(
+            encode_chunks(text.chars(0, text.length)),
+            content_type=FULLTEXT_CONTENT_TYPE,
+        )
+        response['Content-Length'] = text.byte_length
     else:
-        raise NotFound
+        unit, first, last = requested
+        total = text.byte_length if unit == BYTES else text.length
+        try:
+            start, stop = resolve_range(first, last, total)
+        except ValueError:
+            response = HttpResponse(
+                status=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            )
+            response['Content-Range'] = '{} */{}'.format(unit, total)
+            return response
+        if unit == BYTES:
+            chunks = text.bytes(start, stop)
+        else:
+            chunks = encode_chunks(text.chars(start, stop))
+        response = StreamingHttpResponse(
+            chunks,
+            status=HTTP_206_PARTIAL_CONTENT,
+            content_type=FULLTEXT_CONTENT_TYPE,
+        )
+        response['Content-Range'] = '{} {}-{}/{}'.format(
+            unit, start, stop - 1, total,
+        )
+        if unit == BYTES:
+            response['Content-Length'] = stop - start
+    response['Accept-Ranges'] = 'bytes, chars'
+    return response
 
 
-def select_sources_elasticsearch(results):
+def encode_chunks(chunks):
+    """ Encode each of the strings in `chunks` as UTF-8. """
+    for chunk in chunks:
+        yield chunk.encode('utf-8')
+
+
+def search_results_graph(hits):
+    """
+    Return a graph with the metadata and relevance of the sources in `hits`.
+
+    The metadata are taken from the Elasticsearch documents. Only hits
+    that lack a title or author, e.g., because they were indexed before
+    these were stored, are looked up in the triplestore.
+    """
+    result = Graph()
+    incomplete = []
+    for hit in hits:
+        document = hit['_source']
+        if not document.get('title') or not document.get('author'):
+            incomplete.append(hit)
+            continue
+        subject = ns[str(document['id'])]
+        result.add((subject, RDF.type, vocab.Source))
+        result.add((subject, SCHEMA.name, Literal(document['title'])))
+        result.add((subject, SCHEMA.author, Literal(document['author'])))
+        result.add((subject, SCHEMA.inLanguage, KNOWN_LANGUAGES.get(
+            document.get('language'), URIRef(UNKNOWN),
+        )))
+        result.add((subject, vocab.relevance, relevance(hit['_score'])))
+    if incomplete:
+        result += graph_from_triples(list(
+            select_sources_elasticsearch(incomplete)
+        ))
+    return result
+
+
+def select_sources_elasticsearch(hits):
     endpoint = sources_graph()
     selection = '\n'.join(
-        list(map(format_ids_and_relevances, results['hits']['hits'])))
+        list(map(format_ids_and_relevances, hits)))
     query = '{}{}{}{}'.format(
         SELECT_SOURCES_QUERY_START,
         SELECT_SOURCES_QUERY_MIDDLE_RELEVANCE,
@@ -300,31 +524,25 @@ def select_sources_elasticsearch(results):
 
 
 def format_ids_and_relevances(hit):
-    return '(source:{} {})'.format(hit['_source']['id'], hit['_score'])
+    return '(source:{} {})'.format(
+        hit['_source']['id'], relevance(hit['_score']).n3(),
+    )
+
+
+def relevance(score):
+    """
+    Convert an Elasticsearch score to an xsd:decimal literal.
+
+    Scores are floats, whose repr may use exponent notation, which is
+    not allowed in xsd:decimal; going through Decimal avoids it.
+    """
+    return Literal(Decimal(repr(score)))
 
 
 class AddSource(RDFResourceView):
     permission_classes = [IsAuthenticated, UploadSourcePermission]
     parser_classes = [MultiPartParser]
 
-    def store(self, source_file, source_id, source_language, author, title):
-        """ sanitize and store the text in an Elasticsearch index
-        return the sanitized text
-        """
-        raw_text = str(source_file.read().decode('utf8'))
-        xml_sanitized_text = invalid_xml_remove(raw_text)
-        text = html.escape(xml_sanitized_text)
-        es.index(
-            settings.ES_ALIASNAME,
-            optional_localized({
-                'id': source_id,
-                'language': source_language,
-                'author': author,
-                'title': title,
-                'text': text,
-            }))
-        return text
-
     def is_valid(self, data):
         is_valid = True
         missing_fields = []
@@ -339,15 +557,7 @@ class AddSource(RDFResourceView):
         return is_valid, missing_fields
 
     def resolve_language(self, input_language):
-        known_languages = {
-            'en': ISO6391.en,
-            'de': ISO6391.de,
-            'nl': ISO6391.nl,
-            'fr': ISO6391.fr,
-            'it': ISO6391.it,
-            'cs': ISO6391.cs
-        }
-        result = known_languages.get(input_language)
+        result = KNOWN_LANGUAGES.get(input_language)
         if result:
             return result
         else:
@@ -405,29 +615,6 @@ class AddSource(RDFResourceView):
 
         return optionals
 
-    def query_automated_annotations(self, text, uploaded_file, uri):
-        headers = {'Authorization': 'Token token={}'.format(
-            settings.IRISA_TOKEN)}
-        queue = "standard" if len(text) < 50000 else "batch"
-        job_parameters = ("--has-source {}".format(quote(uri, '')))
-        files = {
-            'job[webapp_id]': (None, '1042'),
-            'job[queue]': (None, queue),
-            'files[0]': ('file', text.encode('utf-8')),
-            'job[param]': (None, job_parameters)
-        }
-        response = requests.post(
-            '{}/jobs'.format(settings.IRISA_URL), headers=headers, files=files)
-        if response:
-            job_id = response.json().get('id')
-            # set the time for the query timeout:
-            # 20 minutes for small texts, 24 hours for large texts
-            timeout = 1200 if queue == 'standard' else 86400
-            poll_automated_annotations.delay(job_id, timeout)
-        else:
-            logger.warning(
-                "Failed to send request for automated annotations for source {}".format(uri))
-
     def post(self, request, format=None):
         data = request.data
         is_valid, missing_fields = self.is_valid(data)
@@ -439,13 +626,15 @@ class AddSource(RDFResourceView):
         counter = SourcesCounter.current
         counter.increment()
         new_subject = URIRef(str(counter))
+        serial = get_serial_from_subject(new_subject)
 
-        # store the file in ES index
-        sanitized_text = self.store(data['source'], get_serial_from_subject(new_subject),
-                                    data['language'], data['author'], data['title'])
-
-        self.query_automated_annotations(
-            sanitized_text, data['source'], counter.__str__())
+        # keep the upload until it has been processed
+        filename = default_storage.save(
+            get_media_filename(serial), data['source'],
+        )
+        ingestion = SourceIngestion.objects.create(
+            serial=serial, filename=filename, creator=request.user,
+        )
 
         # TODO: voor author en editor een instantie van SCHEMA.Person maken? Of iets uit CIDOC/ontologie?
         # create graph
@@ -456,15 +645,47 @@ class AddSource(RDFResourceView):
         result.add((new_subject, DCTERMS.creator, user))
         result.add((new_subject, DCTERMS.created, now))
 
-        # add to store
-        full_graph = sources_graph()
-        # below stores result automagically
-        full_graph += result
+        # sanitizing, indexing and storing happen in the background
+        ingest_source(ingestion, {
+            'id': serial,
+            'language': data['language'],
+            'author': data['author'],
+            'title': data['title'],
+        }, result.serialize(format='nt'))
+
+        location = reverse(
+            'sources:ingestion', kwargs={'serial': serial}, request=request,
+        )
+        return Response(result, HTTP_202_ACCEPTED, headers={
+            'Location': location,
+        })
+
+
+class SourceIngestionStatus(RetrieveAPIView):
+    """
+    Report the progress of the ingestion of an uploaded source.
+
+    Only the user who uploaded the source and staff can see it.
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = SourceIngestion.objects.all()
+    serializer_class = SourceIngestionSerializer
+    lookup_field = 'serial'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_staff:
+            return queryset
+        return queryset.filter(creator=user)
 
-        return Response(result, HTTP_201_CREATED)
 
+def construct_es_body(request, includes=()):
+    '''
+    Build a search for the query in `request`, see readit.elasticsearch.
 
-def construct_es_body(request):
+    Hits only carry the document fields in `includes`.
+    '''
     query_string = request.GET.get('query')
     fields = request.GET.get('fields')
     if query_string == '':
@@ -474,11 +695,61 @@ def construct_es_body(request):
         if fields != 'all':
             es_query['fields'] = [fields]
         clause = {"simple_query_string": es_query}
-    body = {"query": clause}
-    return body
+    if settings.ES_PASSAGES:
+        clause = match_passages(clause)
+    return search_body(clause, includes)
+
+
+def parse_page(page):
+    """
+    Return the page number in `page`, 1 if empty.
+
+    Raises ValidationError if `page` is not a positive integer.
+    """
+    if not page:
+        return 1
+    try:
+        number = int(page)
+    except ValueError:
+        raise ValidationError(INVALID_PAGE_400)
+    if number < 1:
+        raise ValidationError(INVALID_PAGE_400)
+    return number
+
+
+def encode_cursor(pit_id, position):
+    """
+    Combine a point in time and the sort values of the last hit into an
+    opaque cursor.
+    """
+    data = json.dumps([pit_id, position]).encode('utf-8')
+    return urlsafe_b64encode(data).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Return the point in time and position of a `cursor`.
+
+    Raises ValidationError if the cursor was not made by `encode_cursor`.
+    """
+    try:
+        pit_id, position = json.loads(urlsafe_b64decode(
+            cursor.encode('ascii')
+        ))
+    except (ValueError, TypeError):
+        raise ValidationError(INVALID_CURSOR_400)
+    if not isinstance(pit_id, str) or not isinstance(position, list):
+        raise ValidationError(INVALID_CURSOR_400)
+    return pit_id, position
 
 
 def get_number_search_results(request):
+    """
+    Return the number of results of a search query.
+
+    SourceSelection reports the same number along with each page of
+    results; this endpoint is kept for clients that only need the count.
+    """
     body = construct_es_body(request)
     results = es.search(body=body, index=settings.ES_ALIASNAME, size=0)
     response = {'total_results': results['hits']['total']
@@ -1,12 +1,24 @@
+from decimal import Decimal
+
+import pytest
+
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
+from rest_framework.exceptions import ValidationError
+
+from rdflib import Literal, URIRef
+
 from rdf.ns import *
+from vocab import namespace as vocab
 
 from . import namespace as my
 from .graph import graph
+from .models import SourceIngestion
 
-from .views import SourceHighlights
+from .views import (SourceHighlights, search_results_graph, parse_page,
+                    encode_cursor, decode_cursor, highlight_body,
+                    highlight_graph, SEARCH_MAX_WINDOW)
 
 
 def test_delete_source_unauthorized(auth_client, sparqlstore):
@@ -32,6 +44,23 @@ def test_delete_source(auth_client, credentials, sparqlstore):
     assert test_triple not in sources
 
 
+def test_ingestion_status(auth_client, credentials, django_user_model):
+    other = django_user_model.objects.create_user(username='other')
+    own = SourceIngestion.objects.create(
+        serial=1, filename='sources/00000001.txt',
+        creator=django_user_model.objects.get(username=credentials[0]),
+    )
+    SourceIngestion.objects.create(
+        serial=2, filename='sources/00000002.txt', creator=other,
+    )
+    assert auth_client.get('/source/add/1').status_code == 200
+    assert auth_client.get('/source/add/2').status_code == 404
+    other.is_staff = True
+    other.save()
+    auth_client.force_login(other)
+    assert auth_client.get('/source/add/1').status_code == 200
+
+
 def test_highlight_body(es_client, es_index_name):
     es_client.create(es_index_name, id=42, body={
         'id': 42,
@@ -49,6 +78,89 @@ def test_highlight_body(es_client, es_index_name):
     assert 'highlight' in results['hits']['hits'][0]
 
 
+def test_highlight_body_batch(es_client, es_index_name):
+    for serial, title in ((42, 'The answer'), (43, 'Another answer')):
+        es_client.create(es_index_name, id=serial, body={
+            'id': serial,
+            'title': title,
+            'author': 'Douglas Adams',
+            'text': 'The question is: what is the question?'
+        }, refresh=True)
+    body = highlight_body(
+        {'terms': {'id': [42, 43]}}, 'answer', 'title', ['id'],
+    )
+    results = es_client.search(index=es_index_name, body=body)
+    hits = results['hits']['hits']
+    assert {hit['_source']['id'] for hit in hits} == {42, 43}
+    assert all('text' not in hit['_source'] for hit in hits)
+    assert all('title' in hit['highlight'] for hit in hits)
+
+
+def test_highlight_graph():
+    highlights = {
+        'title': ['The <mark>answer</mark>'],
+        'text': ['the <mark>answer</mark> is'],
+    }
+    result = highlight_graph(highlights, my['42'])
+    annotations = set(result.subjects(SCHEMA.about, my['42']))
+    assert len(annotations) == 2
+    text_annotation, = result.subjects(OA.hasTarget, SCHEMA.text)
+    assert result.value(text_annotation, OA.hasBody) == Literal(
+        '(...) the <mark>answer</mark> is (...)'
+    )
+
+
 def test_irisa_token():
     """ This test is expected to fail with default settings """
     assert settings.IRISA_TOKEN != None
+
+
+def test_search_results_graph():
+    hits = [{
+        '_score': 1.5,
+        '_source': {
+            'id': 42,
+            'title': 'The answer to everything',
+            'author': 'Douglas Adams',
+            'language': 'en',
+        },
+    }, {
+        '_score': 1.5e-07,
+        '_source': {
+            'id': 43,
+            'title': 'Onbekend',
+            'author': 'Anoniem',
+            'language': 'other',
+        },
+    }]
+    result = search_results_graph(hits)
+    assert (my['42'], SCHEMA.name, Literal('The answer to everything')) in result
+    assert (my['42'], SCHEMA.inLanguage, ISO6391.en) in result
+    assert (my['43'], SCHEMA.inLanguage, URIRef(UNKNOWN)) in result
+    assert result.value(my['42'], vocab.relevance).toPython() == Decimal('1.5')
+    assert str(result.value(my['43'], vocab.relevance)) == '0.00000015'
+    assert len(set(result.subjects(RDF.type, vocab.Source))) == 2
+
+
+def test_parse_page():
+    assert parse_page(None) == 1
+    assert parse_page('') == 1
+    assert parse_page('3') == 3
+    for invalid in ('x', '0', '-2', '1.5'):
+        with pytest.raises(ValidationError):
+            parse_page(invalid)
+
+
+def test_cursor():
+    cursor = encode_cursor('pit==', [1.5, 42])
+    assert decode_cursor(cursor) == ('pit==', [1.5, 42])
+    for invalid in ('', 'not a cursor', encode_cursor(1, [2]),
+                    encode_cursor('pit==', 20), encode_cursor('pit==', 'x')):
+        with pytest.raises(ValidationError):
+            decode_cursor(invalid)
+
+
+def test_search_deep_page(auth_client):
+    page = SEARCH_MAX_WINDOW // settings.RESULTS_PER_PAGE + 1
+    response = auth_client.get('/source/search', {'query': 'x', 'page': page})
+    assert response.status_code == 400
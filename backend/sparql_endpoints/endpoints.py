@@ -1,7 +1,7 @@
-from items.constants import ITEMS_SLUG
+from items.constants import ITEMS_SLUG, ITEMS_CACHE
 from items.graph import graph as items_graph
 
-from nlp_ontology.constants import NLP_ONTOLOGY_ROUTE
+from nlp_ontology.constants import NLP_ONTOLOGY_ROUTE, NLP_ONTOLOGY_CACHE
 from nlp_ontology.graph import graph as nlp_ontology_graph
 
 from ontology.constants import ONTOLOGY_ROUTE
@@ -18,11 +18,13 @@ SPARQL_ENDPOINTS = [
         'route': ITEMS_SLUG,
         'graph': items_graph,
         'enable_update': True,
+        'cache_namespace': ITEMS_CACHE,
     },
     {
         'route': NLP_ONTOLOGY_ROUTE,
         'graph': nlp_ontology_graph,
         'enable_update': True,
+        'cache_namespace': NLP_ONTOLOGY_CACHE,
     },
     {
         'route': ONTOLOGY_ROUTE,
@@ -1,4 +1,5 @@
 from sparql.views import SPARQLQueryAPIView, SPARQLUpdateAPIView
+from readit.cache import bump_version
 from sparql_endpoints.permissions import SPARQLPermission
 
 def sparql_query_view(endpoint_setting):
@@ -22,10 +23,12 @@ def sparql_update_view(endpoint_setting):
     Create an update view based on the setting for a SPARQL endpoint.
 
     Returns a subclass `SPARQLUpdateAPIView that uses the configured graph object
-    and adds the `SPARQLPermission`
+    and adds the `SPARQLPermission`. If the setting has a `cache_namespace`,
+    it is bumped after each successful update.
     '''
 
     graph = endpoint_setting['graph']
+    cache_namespace = endpoint_setting.get('cache_namespace')
 
     class UpdateView(SPARQLUpdateAPIView):
         permission_classes = (SPARQLPermission,)
@@ -33,4 +36,9 @@ def sparql_update_view(endpoint_setting):
         def graph(self):
             return graph()
 
+        def execute_update(self, updatestring):
+            super().execute_update(updatestring)
+            if cache_namespace:
+                bump_version(cache_namespace)
+
     return UpdateView
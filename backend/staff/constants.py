@@ -2,3 +2,6 @@ from django.conf import settings
 
 STAFF_ROUTE = 'staff'
 STAFF_NS = '{}{}#'.format(settings.RDF_NAMESPACE_ROOT, STAFF_ROUTE)
+
+# Cache namespace of the rendered staff graph, see readit.cache
+STAFF_CACHE = 'staff'
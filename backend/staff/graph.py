@@ -32,9 +32,16 @@ def as_rdf(user):
         yield ( subject, lastName,  Literal(last) )
 
 
-def graph():
-    """ Recomputes the staff graph on every invocation. """
+def graph(users=None):
+    """
+    Recomputes the staff graph on every invocation.
+
+    Pass a queryset as `users` to only include those users. Views cache
+    the rendered result instead, see staff.signals.
+    """
+    if users is None:
+        users = User.objects.all()
     g = Graph()
-    for user in User.objects.all():
+    for user in users.only('username', 'first_name', 'last_name'):
         append_triples(g, as_rdf(user))
     return g
@@ -0,0 +1,26 @@
+"""
+Invalidate the cached staff graph whenever a user changes.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from readit.cache import bump_version
+from .constants import STAFF_CACHE
+
+# Fields of User that do not appear in the staff graph, see graph.as_rdf
+IRRELEVANT_FIELDS = frozenset(['last_login', 'password'])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields and IRRELEVANT_FIELDS.issuperset(update_fields):
+        # happens on every login
+        return
+    bump_version(STAFF_CACHE)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_version(STAFF_CACHE)
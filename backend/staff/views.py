@@ -1,7 +1,39 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator, InvalidPage
+
+from rest_framework.exceptions import NotFound
+
 from rdf.views import RDFView
+from readit.cache import VersionedCacheMixin
+from .constants import STAFF_CACHE
 from .graph import graph
 
-class ListStaff(RDFView):
-    """ List the full staff in RDF. """
+class ListStaff(VersionedCacheMixin, RDFView):
+    """
+    List the full staff in RDF.
+
+    Pass a `username` parameter to describe only that user, or a `page`
+    parameter to list STAFF_PER_PAGE users at a time, ordered by
+    username. Responses are cached until a user changes.
+    """
+    cache_namespace = STAFF_CACHE
+    cache_params = ('username', 'page')
+
     def get_graph(self, request, **kwargs):
-        return graph()
+        params = request.query_params
+        username = params.get('username')
+        page = params.get('page')
+        if username:
+            result = graph(User.objects.filter(username=username))
+            if not len(result):
+                raise NotFound
+            return result
+        if not page:
+            return graph()
+        users = User.objects.order_by('username')
+        paginator = Paginator(users, settings.STAFF_PER_PAGE)
+        try:
+            return graph(paginator.page(page).object_list)
+        except InvalidPage:
+            raise NotFound
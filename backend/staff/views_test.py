@@ -0,0 +1,45 @@
+from rdflib import Graph, Literal
+
+from rdf.ns import SKOS
+from . import namespace as my
+
+
+def get_staff(client, query=''):
+    response = client.get('/staff' + query, HTTP_ACCEPT='text/turtle')
+    return response, Graph().parse(data=response.content, format='turtle')
+
+
+def test_list_staff(db, client, django_user_model, settings):
+    settings.STAFF_PER_PAGE = 1
+    django_user_model.objects.create_user(username='alice')
+    django_user_model.objects.create_user(username='bob')
+    response, g = get_staff(client)
+    assert response.status_code == 200
+    assert len(set(g.subjects())) == 2
+    response, g = get_staff(client, '?page=2')
+    assert set(g.subjects()) == {my.bob}
+    response, g = get_staff(client, '?page=3')
+    assert response.status_code == 404
+
+
+def test_staff_member(db, client, django_user_model):
+    django_user_model.objects.create_user(username='alice')
+    django_user_model.objects.create_user(username='bob')
+    response, g = get_staff(client, '?username=alice')
+    assert set(g.subjects()) == {my.alice}
+    assert get_staff(client, '?username=carol')[0].status_code == 404
+
+
+def test_staff_cache(db, client, django_user_model):
+    user = django_user_model.objects.create_user(username='alice')
+    first, g = get_staff(client)
+    user.first_name = 'Alice'
+    user.save()
+    second, g = get_staff(client)
+    assert second['ETag'] != first['ETag']
+    assert (my.alice, SKOS.prefLabel, Literal('alice')) in g
+    assert len(g) == 3
+    user.delete()
+    third, g = get_staff(client)
+    assert third['ETag'] != second['ETag']
+    assert len(g) == 0
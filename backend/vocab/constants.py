@@ -3,3 +3,6 @@ from django.conf import settings
 VOCAB_ROUTE = 'vocab'
 VOCAB_INFIX = '{}#'.format(VOCAB_ROUTE)
 VOCAB_NS = settings.RDF_NAMESPACE_ROOT + VOCAB_INFIX
+
+# Cache namespace of the rendered vocabulary, see readit.cache
+VOCAB_CACHE = 'vocab'
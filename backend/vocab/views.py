@@ -1,8 +1,15 @@
+from django.conf import settings
+
 from rdf.views import RDFView
+from readit.cache import VersionedCacheMixin
+from .constants import VOCAB_CACHE
 from .graph import graph
 
-class ListVocab(RDFView):
+class ListVocab(VersionedCacheMixin, RDFView):
     """ List the full vocabulary in RDF. """
+    cache_namespace = VOCAB_CACHE
+    cache_local = True
+    cache_max_age = settings.RDF_GRAPH_MAX_AGE
 
     def graph(self):
         return graph()
@@ -1,6 +1,6 @@
 import { extend, result, isString } from 'lodash';
 
-import { item } from '../common-rdf/ns';
+import { item, itemPrefix, sourcePrefix } from '../common-rdf/ns';
 import Subject from '../common-rdf/subject';
 import Graph from '../common-rdf/graph';
 import { asURI } from '../utilities/linked-data-utilities';
@@ -147,6 +147,31 @@ export default class ItemGraph extends Graph {
         });
     }
 
+    /**
+     * Replace the contents of this graph by the annotations of the given
+     * source, including their targets and selectors. The annotations are
+     * fetched in pages of `pageSize`, in the order of their position in the
+     * text. Each page is added to the graph as soon as it arrives; the
+     * returned promise resolves with the first page.
+     */
+    annotationsOf(sourceURI: string, pageSize: number = 100): JQuery.jqXHR {
+        const serial = sourceURI.slice(sourcePrefix.length);
+        const url = `${itemPrefix}by-source/${serial}`;
+        const fetchPage = (offset: number): JQuery.jqXHR => {
+            const page = this.fetch({
+                url,
+                data: { offset, limit: pageSize },
+                remove: offset === 0,
+            });
+            page.then((data, status, jqXHR) => {
+                const total = +jqXHR.getResponseHeader('X-Total-Count');
+                if (offset + pageSize < total) fetchPage(offset + pageSize);
+            });
+            return page;
+        };
+        return this.promise = fetchPage(0);
+    }
+
     /**
      * Invokes the given callback when the most recent query completes.
      */
@@ -33,7 +33,6 @@ import {
     isOntologyClass,
     isBlank,
 } from '../utilities/linked-data-utilities';
-import { itemsForSourceQuery } from '../sparql/compile-query';
 import SemanticQuery from '../semantic-search/model';
 import modelToQuery from '../semantic-search/modelToQuery';
 
@@ -349,10 +348,9 @@ export default ExplorerEventController;
  * specified source.
  */
 export function getItems(source: Subject): ItemGraph {
-    const sparqlItems = new ItemGraph();
-    const queryString = itemsForSourceQuery(asURI(source));
-    sparqlItems.sparqlQuery(queryString);
-    return sparqlItems;
+    const items = new ItemGraph();
+    items.annotationsOf(asURI(source));
+    return items;
 }
 
 /**
@@ -1,7 +1,7 @@
-import { extend, omit } from 'lodash';
+import { extend } from 'lodash';
+import { parseLinkHeader } from 'jsonld/lib/util';
 
 import { baseUrl } from 'config.json';
-import Model from '../core/model';
 import { CompositeView } from '../core/view';
 import Graph from '../common-rdf/graph';
 import explorerChannel from '../explorer/explorer-radio';
@@ -11,26 +11,30 @@ import SourceListView from './source-list-view';
 import SourceListPanelTemplate from './source-list-panel-template';
 import PaginationView from '../pagination/pagination-view';
 import Subject from "../common-rdf/subject";
+import { dcterms } from '../common-rdf/ns';
 
 const searchURL = baseUrl + 'source/search';
-const resultsURL = baseUrl + 'source/results_count';
 const routePattern = routePatterns['search:results:sources'];
 
 export default class SourceListPanel extends CompositeView {
     sourceListView: SourceListView;
     paginationView: PaginationView;
     collection: Graph;
+    // URLs of the pages that directly follow pages we have already seen.
+    pageURLs: { [page: number]: string };
 
     initialize() {
+        this.pageURLs = {};
         this.initSourceList();
-        this.fetchResultsCount().once('sync', this.initPagination, this);
         this.on('announceRoute', this.announceRoute);
         this.listenTo(this.model, 'change', this.announceRoute);
     }
 
     initSourceList() {
         this.collection = new Graph();
-        this.fetchSources();
+        this.fetchSources().then(
+            (data, status, jqXHR) => this.initPagination(jqXHR)
+        );
         this.sourceListView = new SourceListView({
             collection: this.collection,
             model: this.model,
@@ -40,17 +44,14 @@ export default class SourceListPanel extends CompositeView {
         );
     }
 
-    fetchResultsCount(): Model {
-        const resultsCount = new Model();
-        resultsCount.fetch({
-            url: resultsURL,
-            data: $.param(omit(this.model.toJSON(), 'page'))
-        });
-        return resultsCount;
-    }
-
-    initPagination(resultsCount: Model) {
-        const totalPages = Math.ceil(resultsCount.get('total_results') / resultsCount.get('results_per_page'));
+    /**
+     * The first page of search results carries the total number of results
+     * and the page size in its headers.
+     */
+    initPagination(jqXHR: JQuery.jqXHR) {
+        const total = +jqXHR.getResponseHeader('X-Total-Count');
+        const perPage = +jqXHR.getResponseHeader('X-Results-Per-Page');
+        const totalPages = Math.ceil(total / perPage);
         this.paginationView = new PaginationView({
             totalPages,
             initialPage: this.model.get('page'),
@@ -59,7 +60,13 @@ export default class SourceListPanel extends CompositeView {
         this.render();
     }
 
-    fetchSources(page?: number) {
+    /**
+     * Fetch a page of search results. Pages that follow a page we have seen
+     * are fetched by the cursor from its Link header, which is cheaper than
+     * skipping over the preceding results. If the cursor has expired, the
+     * page is requested by its number instead.
+     */
+    fetchSources(page?: number): JQuery.jqXHR {
         if (page != null) {
             if (page === 1) {
                 this.model.unset('page');
@@ -67,10 +74,24 @@ export default class SourceListPanel extends CompositeView {
                 this.model.set('page', page);
             }
         }
-        this.collection.fetch({
+        const current = +(this.model.get('page') || 1);
+        const cursorURL = this.pageURLs[current];
+        const request = cursorURL ? this.collection.fetch({
+            url: cursorURL,
+        }) : this.collection.fetch({
             url: searchURL,
             data: $.param(this.model.toJSON()),
         });
+        request.then((data, status, jqXHR) => {
+            const header = jqXHR.getResponseHeader('Link') || '';
+            const links = parseLinkHeader(header);
+            if (links.next) this.pageURLs[current + 1] = links.next.target;
+        }, () => {
+            if (!cursorURL) return;
+            delete this.pageURLs[current];
+            this.fetchSources();
+        });
+        return request;
     }
 
     announceRoute(): void {
@@ -85,8 +106,19 @@ export default class SourceListPanel extends CompositeView {
         return this;
     }
 
+    /**
+     * Search results only contain a summary of each source, so the full
+     * source is fetched before it is opened.
+     */
     onSourceClicked(model: Subject): this {
-        explorerChannel.trigger('source-list:click', this, model);
+        const open = () => explorerChannel.trigger(
+            'source-list:click', this, model
+        );
+        if (model.has(dcterms.created)) {
+            open();
+        } else {
+            model.fetch().then(open);
+        }
         return this;
     }
 }
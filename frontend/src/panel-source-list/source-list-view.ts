@@ -1,5 +1,6 @@
 import { extend } from 'lodash';
 
+import { baseUrl } from 'config.json';
 import Model from '../core/model';
 import { CollectionView, ViewOptions as BaseOpt } from '../core/view';
 import Graph from '../common-rdf/graph';
@@ -12,6 +13,7 @@ import SourceSummaryView from './source-summary-view';
 import LoadingSpinnerView from '../loading-spinner/loading-spinner-view';
 
 const announce = announceRoute('explore');
+const highlightsURL = baseUrl + 'source/highlights';
 
 export interface ViewOptions extends BaseOpt {
     collection: Graph;
@@ -21,6 +23,7 @@ export interface ViewOptions extends BaseOpt {
 export default class SourceListView extends CollectionView<Model, SourceSummaryView> {
     noResults = false;
     loadingSpinnerView: LoadingSpinnerView;
+    highlights: Graph;
 
     constructor(options?: ViewOptions) {
         super(options);
@@ -30,6 +33,8 @@ export default class SourceListView extends CollectionView<Model, SourceSummaryV
         if (this.model) {
             this.collection.comparator = this.sortByRelevance;
             this.collection.sort();
+            this.highlights = new Graph();
+            this.listenTo(this.collection, 'sync', this.fetchHighlights);
         }
         else this.collection.comparator = this.sortByDate;
         this.loadingSpinnerView = new LoadingSpinnerView();
@@ -40,9 +45,8 @@ export default class SourceListView extends CollectionView<Model, SourceSummaryV
     }
 
     makeItem(model: Subject): SourceSummaryView {
-        const query = this.model ? this.model.get('query') : undefined;
-        const fields = this.model ? this.model.get('fields') : undefined;
-        let view = new SourceSummaryView({ model, query, fields });
+        const highlights = this.highlights;
+        let view = new SourceSummaryView({ model, highlights });
         this.listenTo(view, 'click', this.onSourceClicked);
         return view;
     }
@@ -68,6 +72,24 @@ export default class SourceListView extends CollectionView<Model, SourceSummaryV
         this.render();
     }
 
+    /**
+     * Fetch the highlights of the search query in all listed sources with a
+     * single request. Syncs of individual sources are ignored.
+     */
+    fetchHighlights(synced: Graph | Subject): void {
+        if (synced !== this.collection) return;
+        const query = this.model.get('query');
+        if (query === undefined || !this.collection.length) return;
+        this.highlights.fetch({
+            url: highlightsURL,
+            data: $.param({
+                query,
+                fields: this.model.get('fields'),
+                source: this.collection.map(source => source.id),
+            }, true),
+        });
+    }
+
     onSourceClicked(sourceCid: string): this {
         this.trigger('source:clicked', this.collection.get(sourceCid));
         return this;
@@ -1,7 +1,6 @@
 import { extend } from 'lodash';
 import { ViewOptions as BaseOpt } from 'backbone';
 
-import { baseUrl } from 'config.json';
 import View from '../core/view';
 import Subject from '../common-rdf/subject';
 import { dcterms, oa, schema } from '../common-rdf/ns';
@@ -10,51 +9,50 @@ import Graph from '../common-rdf/graph';
 
 export interface ViewOptions extends BaseOpt<Subject> {
     model: Subject;
-    query?: string;
-    fields?: string;
+    highlights?: Graph;
 }
 
-const highlightURL = baseUrl + 'source/highlight';
-
 export default class SourceSummaryView extends View {
     name: string;
     author: string;
-    query: string;
-    fields: string;
     identifier: string;
     highlights: Graph;
     snippets: string[];
 
 
     initialize(options: ViewOptions): this {
-        this.query = options.query;
-        this.fields = options.fields;
         this.name = this.model.get(schema('name'))[0];
         this.author = this.model.get(schema.author)[0];
         this.identifier = this.model.id as string;
-        if (this.query !== undefined) {
-            this.renderHighlights();
+        this.highlights = options.highlights;
+        if (this.highlights) {
+            this.listenTo(this.highlights, 'sync', this.renderHighlights);
         }
-        else this.render();
+        this.render();
         return this;
     }
 
-    async renderHighlights() {
-        this.highlights = new Graph();
-        await this.highlights.fetch({url: highlightURL, data: $.param({ source: this.identifier, query: this.query, fields: this.fields}) });
-        const titleSubject = this.highlights.models.find(subject => subject.get(oa.hasTarget)[0]['id']===dcterms.title);
+    /**
+     * Show the highlights of this source, which the list fetches for all of
+     * its sources at once.
+     */
+    renderHighlights(): this {
+        const highlights = this.highlights.filter(
+            subject => subject.has(schema.about, { '@id': this.identifier })
+        );
+        const titleSubject = highlights.find(subject => subject.get(oa.hasTarget)[0]['id']===dcterms.title);
         if (titleSubject) {
             this.name = titleSubject.get(oa.hasBody)[0].toString();
         }
-        const authorSubject = this.highlights.models.find(subject => subject.has(oa.hasTarget, schema.author));
+        const authorSubject = highlights.find(subject => subject.has(oa.hasTarget, schema.author));
         if (authorSubject) {
             this.author = authorSubject.get(oa.hasBody)[0].toString();
         }
-        const textSubject = this.highlights.models.find(subject => subject.get(oa.hasTarget)[0]['id']===schema.text);
+        const textSubject = highlights.find(subject => subject.get(oa.hasTarget)[0]['id']===schema.text);
         if (textSubject) {
             this.snippets = textSubject.get(oa.hasBody).map(snip => snip.toString());
         }
-        this.render();
+        return this.render();
     }
 
     render(): this {
@@ -1,9 +0,0 @@
-import { itemsForSourceQuery } from './compile-query';
-
-describe('itemsForSourceQuery', function () {
-    it('builds a query for annotations of a given source', function () {
-        const source = 'example.com/42'
-        let query = itemsForSourceQuery(source);
-        expect(query).toContain('?target oa:hasSource <example.com/42>')
-    });
-});
\ No newline at end of file
@@ -2,7 +2,6 @@ import Model from '../core/model';
 import { source, item, nsTable, nsMap } from '../common-rdf/ns';
 import userChannel from '../common-user/user-radio';
 
-import itemsTemplate from './query-templates/items-for-source-template';
 import countNodesTemplate from './query-templates/count-subjects-template';
 import nodesByUserTemplate from './query-templates/subjects-by-user-template';
 import randomNodesTemplate from './query-templates/random-subjects-template';
@@ -23,13 +22,6 @@ const defaultOptions = {
     namespaces: nsMap,
 };
 
-export function itemsForSourceQuery(
-    sourceURI: string, options: SPARQLQueryOptions = {}
-) {
-    const data = { ...defaultOptions, sourceURI, ...options };
-    return itemsTemplate(data);
-}
-
 export function countSubjectsQuery(
     itemQuery: boolean, options: SPARQLQueryOptions = {}
 ) {